@@ -5,11 +5,11 @@ Clean, ChatGPT-style interface for generating flashcards.
 
 import streamlit as st
 import os
-from dotenv import load_dotenv
+from auth import get_app_password, load_env
 from database import init_database
 
-# Load .env file for local development
-load_dotenv()
+# Load .env file for local development (once per process)
+load_env()
 
 # App configuration
 st.set_page_config(
@@ -113,12 +113,7 @@ def validate_api_key(api_key: str) -> tuple[bool, str]:
 
 def check_password():
     """Simple password check. Auto-authenticates if APP_PASSWORD matches env."""
-    correct_password = os.getenv("APP_PASSWORD", "")
-    if not correct_password:
-        try:
-            correct_password = st.secrets.get("APP_PASSWORD", "")
-        except:
-            correct_password = ""
+    correct_password = get_app_password()
     
     # No password configured - allow access
     if not correct_password:
@@ -0,0 +1,51 @@
+"""
+Shared authentication helpers for Streamlit Flashcard App for Complex Topics.
+"""
+
+import os
+from functools import lru_cache
+
+import streamlit as st
+from dotenv import load_dotenv
+
+
+@lru_cache(maxsize=1)
+def load_env() -> bool:
+    """
+    Load the local .env file once per process instead of on every rerun.
+    
+    Returns:
+        True if a .env file was found and loaded
+    """
+    return load_dotenv()
+
+
+@lru_cache(maxsize=1)
+def get_app_password() -> str:
+    """
+    Resolve the configured app password once per process.
+    
+    Returns:
+        APP_PASSWORD from the environment or Streamlit secrets, or '' if unset
+    """
+    load_env()
+    password = os.getenv("APP_PASSWORD", "")
+    if password:
+        return password
+    # No secrets.toml is the normal local setup, so check for one instead of
+    # catching the error st.secrets raises when it is missing
+    if not st.secrets.load_if_toml_exists():
+        return ""
+    return st.secrets.get("APP_PASSWORD", "")
+
+
+def require_auth() -> None:
+    """
+    Send the user back to the home page unless they are logged in and have an API key.
+    
+    Stops the current script run when the check fails.
+    """
+    state = st.session_state
+    if (get_app_password() and not state.get("password_correct", False)) or not state.get("user_api_key"):
+        st.switch_page("app.py")
+        st.stop()
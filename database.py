@@ -4,8 +4,9 @@ Handles all Supabase database operations.
 """
 
 import streamlit as st
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import uuid
 import os
 from dotenv import load_dotenv
@@ -13,8 +14,14 @@ from dotenv import load_dotenv
 # Load .env file for local development
 load_dotenv()
 
+# Cached cardset lists are cleared on every write from this process;
+# the TTL bounds staleness from writes made by other processes
+CARDSETS_CACHE_TTL = 30  # seconds
+FLASHCARDS_CACHE_TTL = 300  # seconds
+
 # Initialize Supabase client
 from supabase import create_client, Client
+from postgrest import ReturnMethod
 
 
 def get_supabase_client() -> Client:
@@ -43,10 +50,23 @@ def get_client() -> Client:
     return get_supabase_client()
 
 
+@st.cache_resource
+def get_db_writer() -> ThreadPoolExecutor:
+    """
+    Background thread for writes whose result the page does not wait for.
+    
+    A single worker keeps those writes in the order they were submitted.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+
+
+@st.cache_resource(show_spinner=False)
 def init_database():
     """
     Initialize database connection (tables already created in Supabase).
     This function is kept for compatibility but tables are managed in Supabase dashboard.
+    Cached per process, so the connectivity check runs once rather than on
+    every rerun; a failed check raises and is retried on the next run.
     """
     # Tables are created in Supabase dashboard, just verify connection
     try:
@@ -78,7 +98,8 @@ def create_cardset(topic: str, num_cards: int, complexity: str) -> str:
         "topic": topic,
         "num_cards": num_cards,
         "complexity_level": complexity
-    }).execute()
+    }, returning=ReturnMethod.minimal).execute()
+    clear_cardsets_cache()
     
     return cardset_id
 
@@ -132,7 +153,35 @@ def save_flashcards_bulk(cardset_id: str, topic: str, flashcards: List[Dict], co
         for card in flashcards
     ]
     
-    client.table("flashcards").insert(cards_to_insert).execute()
+    # Single multi-row INSERT; skip echoing the inserted rows back
+    client.table("flashcards").insert(cards_to_insert, returning=ReturnMethod.minimal).execute()
+
+
+def create_cardset_with_flashcards(topic: str, flashcards: List[Dict], complexity: str) -> str:
+    """
+    Create a cardset and save all of its flashcards as one unit.
+    
+    Supabase's REST API has no client-side transactions, so if saving the
+    flashcards fails the new cardset is removed again instead of being left empty.
+    
+    Args:
+        topic: The topic of the flashcard set
+        flashcards: List of dicts with 'question' and 'answer' keys
+        complexity: Complexity level (Beginner, Intermediate, Advanced)
+    
+    Returns:
+        The unique cardset_id
+    """
+    cardset_id = create_cardset(topic, len(flashcards), complexity)
+    
+    try:
+        save_flashcards_bulk(cardset_id, topic, flashcards, complexity)
+    except Exception:
+        get_client().table("cardsets").delete().eq("cardset_id", cardset_id).execute()
+        clear_cardsets_cache()
+        raise
+    
+    return cardset_id
 
 
 def get_all_cardsets() -> List[Dict]:
@@ -148,6 +197,110 @@ def get_all_cardsets() -> List[Dict]:
     return result.data
 
 
+@st.cache_data(ttl=CARDSETS_CACHE_TTL, show_spinner=False)
+def get_all_cardsets_cached() -> List[Dict]:
+    """
+    Get all cardsets, shared across sessions until the cache is cleared or expires.
+    
+    Returns:
+        List of cardset dictionaries
+    """
+    return get_all_cardsets()
+
+
+def count_cardsets() -> int:
+    """
+    Count cardsets without fetching any rows.
+    
+    Returns:
+        Number of cardsets
+    """
+    client = get_client()
+    result = client.table("cardsets").select("cardset_id", count="exact", head=True).execute()
+    
+    return result.count or 0
+
+
+@st.cache_data(ttl=CARDSETS_CACHE_TTL, show_spinner=False)
+def count_cardsets_cached() -> int:
+    """
+    Count cardsets, shared across sessions until the cache is cleared or expires.
+    
+    Returns:
+        Number of cardsets
+    """
+    return count_cardsets()
+
+
+def get_cardsets_stats() -> Tuple[int, int]:
+    """
+    Get the number of cardsets and the total number of cards across them.
+    
+    PostgREST aggregate functions are disabled by default on Supabase, so
+    this fetches only the num_cards column and sums it here.
+    
+    Returns:
+        Tuple of (number of cardsets, total cards)
+    """
+    client = get_client()
+    result = client.table("cardsets").select("num_cards", count="exact").execute()
+    
+    return result.count or 0, sum(row["num_cards"] for row in result.data)
+
+
+@st.cache_data(ttl=CARDSETS_CACHE_TTL, show_spinner=False)
+def get_cardsets_stats_cached() -> Tuple[int, int]:
+    """
+    Get cardset stats, shared across sessions until the cache is cleared or expires.
+    
+    Returns:
+        Tuple of (number of cardsets, total cards)
+    """
+    return get_cardsets_stats()
+
+
+def get_cardsets(limit: int, offset: int = 0) -> List[Dict]:
+    """
+    Get one page of cardsets, newest first.
+    
+    Args:
+        limit: Maximum number of cardsets to return
+        offset: Number of cardsets to skip
+    
+    Returns:
+        List of cardset dictionaries
+    """
+    client = get_client()
+    result = client.table("cardsets").select(
+        "cardset_id, topic, num_cards, complexity_level, created_at"
+    ).order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+    
+    return result.data
+
+
+@st.cache_data(ttl=CARDSETS_CACHE_TTL, show_spinner=False)
+def get_cardsets_cached(limit: int, offset: int = 0) -> List[Dict]:
+    """
+    Get one page of cardsets, shared across sessions until the cache is cleared or expires.
+    
+    Args:
+        limit: Maximum number of cardsets to return
+        offset: Number of cardsets to skip
+    
+    Returns:
+        List of cardset dictionaries
+    """
+    return get_cardsets(limit, offset)
+
+
+def clear_cardsets_cache():
+    """Drop cached cardset lists and counts after cardsets are added, changed or removed."""
+    get_all_cardsets_cached.clear()
+    count_cardsets_cached.clear()
+    get_cardsets_stats_cached.clear()
+    get_cardsets_cached.clear()
+
+
 def get_flashcards_by_set(cardset_id: str) -> List[Dict]:
     """
     Get all flashcards in a specific cardset.
@@ -168,6 +321,28 @@ def get_flashcards_by_set(cardset_id: str) -> List[Dict]:
     return result.data
 
 
+@st.cache_data(ttl=FLASHCARDS_CACHE_TTL, show_spinner=False)
+def get_flashcards_by_set_cached(cardset_id: str) -> List[Dict]:
+    """
+    Get all flashcards in a cardset, cached across reruns and sessions.
+    
+    Cleared when explanations or mnemonics are saved. Review counters
+    (times_reviewed, last_reviewed_at) may lag until the TTL expires.
+    
+    Args:
+        cardset_id: The ID of the cardset
+    
+    Returns:
+        List of flashcard dictionaries
+    """
+    return get_flashcards_by_set(cardset_id)
+
+
+def clear_flashcards_cache():
+    """Drop cached flashcard lists after flashcard content changes."""
+    get_flashcards_by_set_cached.clear()
+
+
 def get_cardset_by_id(cardset_id: str) -> Optional[Dict]:
     """
     Get a specific cardset by ID.
@@ -220,29 +395,47 @@ def set_review_order(cardset_id: str, order: str):
         client.table("cardsets").update({
             "review_order": order
         }).eq("cardset_id", cardset_id).execute()
+        clear_cardsets_cache()
     except Exception as e:
         # Column might not exist - user needs to add it in Supabase
         st.warning(f"Could not save review order preference. Please add 'review_order' column (type: text) to the cardsets table in Supabase.")
 
 
-def update_review_stats(card_id: int):
+def record_reviews_in_background(reviews: List[Tuple[int, str]]) -> Optional[Future]:
     """
-    Update the review statistics for a flashcard.
+    Apply a buffer of answer reveals to the flashcards' review statistics
+    on the background DB thread.
+    
+    Current counts for every card are read in one request, then each card
+    gets a single update however many times it was reviewed.
     
     Args:
-        card_id: The ID of the flashcard
+        reviews: (card_id, reviewed_at ISO timestamp) pairs, oldest first
+    
+    Returns:
+        Future for the write, or None if there was nothing to write
     """
-    client = get_client()
+    if not reviews:
+        return None
+    return get_db_writer().submit(_write_reviews, get_client(), list(reviews))
+
+
+def _write_reviews(client: Client, reviews: List[Tuple[int, str]]):
+    """Apply a buffer of answer reveals using the given client."""
+    counts: Dict[int, int] = {}
+    last_reviewed: Dict[int, str] = {}
+    for card_id, reviewed_at in reviews:
+        counts[card_id] = counts.get(card_id, 0) + 1
+        last_reviewed[card_id] = reviewed_at
     
-    # First get current times_reviewed
-    result = client.table("flashcards").select("times_reviewed").eq("id", card_id).execute()
-    current_reviews = result.data[0]["times_reviewed"] if result.data else 0
+    result = client.table("flashcards").select("id, times_reviewed").in_("id", list(counts)).execute()
+    current = {row["id"]: row["times_reviewed"] or 0 for row in result.data}
     
-    # Update with incremented value
-    client.table("flashcards").update({
-        "times_reviewed": (current_reviews or 0) + 1,
-        "last_reviewed_at": datetime.now().isoformat()
-    }).eq("id", card_id).execute()
+    for card_id, count in counts.items():
+        client.table("flashcards").update({
+            "times_reviewed": current.get(card_id, 0) + count,
+            "last_reviewed_at": last_reviewed[card_id]
+        }).eq("id", card_id).execute()
 
 
 def save_explanation(card_id: int, explanation_type: str, explanation_text: str):
@@ -260,6 +453,7 @@ def save_explanation(card_id: int, explanation_type: str, explanation_text: str)
     client.table("flashcards").update({
         column: explanation_text
     }).eq("id", card_id).execute()
+    clear_flashcards_cache()
 
 
 def get_explanation(card_id: int, explanation_type: str) -> Optional[str]:
@@ -296,6 +490,7 @@ def save_mnemonic(card_id: int, mnemonic_text: str):
     client.table("flashcards").update({
         "mnemonic": mnemonic_text
     }).eq("id", card_id).execute()
+    clear_flashcards_cache()
 
 
 def get_mnemonic(card_id: int) -> Optional[str]:
@@ -317,6 +512,26 @@ def get_mnemonic(card_id: int) -> Optional[str]:
     return None
 
 
+def save_card_extras(extras: Dict[int, Dict[str, str]]):
+    """
+    Save generated explanations and mnemonics for many flashcards.
+    
+    One update per card covers all of its columns, and the caches are
+    cleared once at the end rather than after every card.
+    
+    Args:
+        extras: Column values per card ID, e.g. {12: {"explanation_eli5": ..., "mnemonic": ...}}
+    """
+    if not extras:
+        return
+    
+    client = get_client()
+    for card_id, columns in extras.items():
+        client.table("flashcards").update(columns).eq("id", card_id).execute()
+    
+    clear_flashcards_cache()
+
+
 def delete_cardset(cardset_id: str):
     """
     Delete a cardset and all its flashcards.
@@ -324,10 +539,26 @@ def delete_cardset(cardset_id: str):
     Args:
         cardset_id: The ID of the cardset to delete
     """
+    delete_cardsets([cardset_id])
+
+
+def delete_cardsets(cardset_ids: List[str]):
+    """
+    Delete several cardsets and all their flashcards.
+    
+    Each table is cleared with one filtered request for all the cardsets,
+    so the number of round trips does not grow with the number of decks.
+    
+    Args:
+        cardset_ids: The IDs of the cardsets to delete
+    """
+    if not cardset_ids:
+        return
+    
     client = get_client()
     
-    # Get all flashcard IDs for this cardset to delete their progress
-    flashcards = client.table("flashcards").select("id").eq("cardset_id", cardset_id).execute()
+    # Get all flashcard IDs for these cardsets to delete their progress
+    flashcards = client.table("flashcards").select("id").in_("cardset_id", cardset_ids).execute()
     card_ids = [f["id"] for f in flashcards.data]
     
     # Delete card progress for these flashcards
@@ -335,10 +566,12 @@ def delete_cardset(cardset_id: str):
         client.table("card_progress").delete().in_("card_id", card_ids).execute()
     
     # Delete flashcards (CASCADE should handle this, but being explicit)
-    client.table("flashcards").delete().eq("cardset_id", cardset_id).execute()
+    client.table("flashcards").delete().in_("cardset_id", cardset_ids).execute()
     
-    # Delete cardset
-    client.table("cardsets").delete().eq("cardset_id", cardset_id).execute()
+    # Delete cardsets
+    client.table("cardsets").delete().in_("cardset_id", cardset_ids).execute()
+    clear_cardsets_cache()
+    clear_flashcards_cache()
 
 
 # ============================================
@@ -365,27 +598,21 @@ def get_card_progress(card_id: int) -> Optional[Dict]:
     return None
 
 
-def update_card_progress(card_id: int, rating: str) -> Dict:
+def schedule_review(progress: Optional[Dict], rating: str) -> Dict:
     """
-    Update card progress based on user rating (Anki SM-2 algorithm).
+    Apply a rating to a card's progress (Anki SM-2 algorithm) without touching the database.
     
     Args:
-        card_id: The flashcard ID
+        progress: Current progress with 'ease_factor', 'interval_days' and 'repetitions',
+            or None for a card never rated
         rating: One of 'again', 'hard', 'good', 'easy'
     
     Returns:
-        Dict with new interval and next review date
+        New progress with 'ease_factor', 'interval_days', 'repetitions',
+        'next_review_date' and 'last_review_date'
     """
-    client = get_client()
-    
-    # Get existing progress or create new
-    result = client.table("card_progress").select("*").eq("card_id", card_id).execute()
-    
-    if result.data:
-        progress = result.data[0]
-    else:
+    if not progress:
         progress = {
-            'card_id': card_id,
             'ease_factor': 2.5,
             'interval_days': 0,
             'repetitions': 0
@@ -402,7 +629,6 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
         interval = 0  # Will show again in same session or next minute
         ease_factor = max(1.3, ease_factor - 0.2)
         reps = 0
-        next_interval_minutes = 1  # Show again in 1 minute
     elif rating == 'hard':
         # Struggled but got it
         if interval == 0:
@@ -411,7 +637,6 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
             interval = max(1, int(interval * 1.2))
         ease_factor = max(1.3, ease_factor - 0.15)
         reps += 1
-        next_interval_minutes = interval * 24 * 60
     elif rating == 'good':
         # Normal recall
         if reps == 0:
@@ -421,7 +646,6 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
         else:
             interval = int(interval * ease_factor)
         reps += 1
-        next_interval_minutes = interval * 24 * 60
     elif rating == 'easy':
         # Easy recall - bonus interval
         if reps == 0:
@@ -432,7 +656,6 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
             interval = int(interval * ease_factor * 1.3)
         ease_factor = min(3.0, ease_factor + 0.15)
         reps += 1
-        next_interval_minutes = interval * 24 * 60
     
     # Calculate next review date
     now = datetime.now()
@@ -441,15 +664,63 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
     else:
         next_review = now + timedelta(days=interval)
     
-    # Upsert progress
-    progress_data = {
-        "card_id": card_id,
+    return {
         "ease_factor": ease_factor,
         "interval_days": interval,
         "repetitions": reps,
         "next_review_date": next_review.isoformat(),
         "last_review_date": now.isoformat()
     }
+
+
+def update_card_progress(card_id: int, rating: str) -> Dict:
+    """
+    Update card progress based on user rating (Anki SM-2 algorithm).
+    
+    Args:
+        card_id: The flashcard ID
+        rating: One of 'again', 'hard', 'good', 'easy'
+    
+    Returns:
+        Dict with new interval and next review date
+    """
+    progress = get_card_progress(card_id)
+    progress_data = schedule_review(progress, rating)
+    _write_card_progress(get_client(), card_id, progress_data)
+    
+    return {
+        'interval_days': progress_data['interval_days'],
+        'ease_factor': progress_data['ease_factor'],
+        'next_review': progress_data['next_review_date'],
+        'repetitions': progress_data['repetitions']
+    }
+
+
+def update_card_progress_in_background(card_id: int, rating: str, progress: Optional[Dict]) -> Tuple[Dict, Future]:
+    """
+    Rate a card from progress the caller already has, saving it on the background DB thread.
+    
+    Args:
+        card_id: The flashcard ID
+        rating: One of 'again', 'hard', 'good', 'easy'
+        progress: The card's current progress (e.g. from get_cards_progress), or None if never rated
+    
+    Returns:
+        Tuple of (new progress as returned by schedule_review, Future for the write)
+    """
+    progress_data = schedule_review(progress, rating)
+    future = get_db_writer().submit(_write_card_progress, get_client(), card_id, progress_data)
+    return progress_data, future
+
+
+def _write_card_progress(client: Client, card_id: int, progress_data: Dict):
+    """
+    Upsert a card's progress row using the given client.
+    
+    Review stats are not touched here: the answer reveal before a rating
+    already counts the review (see record_reviews_in_background).
+    """
+    progress_data = {"card_id": card_id, **progress_data}
     
     # Try to update, if no rows affected, insert
     existing = client.table("card_progress").select("id").eq("card_id", card_id).execute()
@@ -458,16 +729,27 @@ def update_card_progress(card_id: int, rating: str) -> Dict:
         client.table("card_progress").update(progress_data).eq("card_id", card_id).execute()
     else:
         client.table("card_progress").insert(progress_data).execute()
+
+
+def get_cards_progress(card_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Get spaced repetition progress for many cards in one query.
     
-    # Also update the flashcards table
-    update_review_stats(card_id)
+    Args:
+        card_ids: The flashcard IDs
     
-    return {
-        'interval_days': interval,
-        'ease_factor': ease_factor,
-        'next_review': next_review.isoformat(),
-        'repetitions': reps
-    }
+    Returns:
+        Progress rows keyed by card ID; cards never rated are left out
+    """
+    if not card_ids:
+        return {}
+    
+    client = get_client()
+    result = client.table("card_progress").select(
+        "card_id, ease_factor, interval_days, repetitions"
+    ).in_("card_id", card_ids).execute()
+    
+    return {row['card_id']: row for row in result.data}
 
 
 def get_next_intervals(card_id: int) -> Dict[str, str]:
@@ -477,8 +759,20 @@ def get_next_intervals(card_id: int) -> Dict[str, str]:
     Returns:
         Dict with 'again', 'hard', 'good', 'easy' intervals as strings
     """
-    progress = get_card_progress(card_id)
+    return compute_next_intervals(get_card_progress(card_id))
+
+
+def compute_next_intervals(progress: Optional[Dict]) -> Dict[str, str]:
+    """
+    Compute the next interval for each rating option from a card's progress.
     
+    Args:
+        progress: Progress with 'ease_factor', 'interval_days' and 'repetitions',
+            as returned by get_cards_progress or update_card_progress, or None for a new card
+    
+    Returns:
+        Dict with 'again', 'hard', 'good', 'easy' intervals as strings
+    """
     if not progress:
         # New card defaults
         return {
@@ -7,23 +7,82 @@ Includes cost tracking with spending limit protection.
 import os
 import json
 import re
-from typing import List, Dict, Optional
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator, List, Dict, Optional, TypedDict
 from pathlib import Path
-import anthropic
+import msgspec
 import streamlit as st
 
+if TYPE_CHECKING:
+    # The Anthropic SDK (and httpx under it) is slow to import, so it is only
+    # loaded the first time a client is actually needed.
+    import anthropic
+    import httpx
+
 # Model configuration
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
-MAX_TOKENS = 8192  # Increased for comprehensive flashcard generation
+MAX_TOKENS = 8192  # Upper bound for comprehensive flashcard generation
+TOKENS_PER_CARD = 400  # Detailed 5-12 sentence answers, sometimes with code
+RESPONSE_OVERHEAD_TOKENS = 256  # JSON scaffolding around the cards
+ELI5_MAX_TOKENS = 256  # 2-4 short sentences
+ELI10_MAX_TOKENS = 384  # 3-5 sentences
+CARD_EXTRAS_MAX_TOKENS = 1280  # ELI5 and mnemonic together in one JSON reply
+
+# HTTP connection configuration (shared across all Anthropic requests)
+HTTP_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 60  # seconds an idle connection is kept open
+
+# Per-API-key clients are cached process-wide; bound them so users' keys are
+# not held for the life of the process
+ANTHROPIC_CLIENT_CACHE_ENTRIES = 32
+ANTHROPIC_CLIENT_CACHE_TTL = 3600  # seconds
+
+# Concurrency for multi-topic generation
+MAX_CONCURRENT_REQUESTS = 8
+
+# Background threads for generation started from the Generate page
+GENERATION_WORKERS = 4
+
+# Retries for 429/5xx and connection errors. The SDK backs off exponentially
+# and waits for the Retry-After header when the API sends one.
+MAX_RETRIES = 4
 
 # Cost configuration (per million tokens)
 INPUT_COST_PER_MILLION = 3.00   # $3 per 1M input tokens
 OUTPUT_COST_PER_MILLION = 15.00  # $15 per 1M output tokens
+BATCH_PRICE_MULTIPLIER = 0.5  # Message Batches are billed at half price
 
 # Cost tracking file
 COST_TRACKER_FILE = Path(__file__).parent / ".cost_tracker.json"
 
 
+class Flashcard(TypedDict):
+    """A single generated flashcard."""
+    question: str
+    answer: str
+
+
+class FlashcardResponse(TypedDict):
+    """Expected shape of Claude's flashcard generation response."""
+    flashcards: List[Flashcard]
+
+
+# Typed decoders: unknown keys (e.g. "difficulty", "tags") are skipped while
+# decoding and missing question/answer fields fail validation.
+_RESPONSE_DECODER = msgspec.json.Decoder(FlashcardResponse)
+_FLASHCARD_LIST_DECODER = msgspec.json.Decoder(List[Flashcard])
+_FLASHCARD_DECODER = msgspec.json.Decoder(Flashcard)
+
+
+class CardExtras(TypedDict):
+    eli5: str
+    mnemonic: str
+
+
+_CARD_EXTRAS_DECODER = msgspec.json.Decoder(CardExtras)
+
+
 def get_spending_limit() -> float:
     """Get spending limit from session state or default."""
     return st.session_state.get("user_spending_limit", 10.0)
@@ -61,16 +120,21 @@ def get_cost_details() -> Dict:
     }
 
 
-def update_cost_tracker(input_tokens: int, output_tokens: int) -> float:
+def update_cost_tracker(input_tokens: int, output_tokens: int, price_multiplier: float = 1.0) -> float:
     """
     Update the cost tracker with new token usage.
     
+    Args:
+        input_tokens: Input tokens used
+        output_tokens: Output tokens used
+        price_multiplier: Applied to the standard prices (BATCH_PRICE_MULTIPLIER for batches)
+    
     Returns:
         The cost of this API call
     """
     input_cost = (input_tokens / 1_000_000) * INPUT_COST_PER_MILLION
     output_cost = (output_tokens / 1_000_000) * OUTPUT_COST_PER_MILLION
-    call_cost = input_cost + output_cost
+    call_cost = (input_cost + output_cost) * price_multiplier
     
     # Load existing data
     data = get_cost_details()
@@ -118,8 +182,37 @@ def reset_cost_tracker():
         json.dump(data, f, indent=2)
 
 
-def get_client():
-    """Get configured Anthropic client using session state API key."""
+@st.cache_resource
+def get_http_client() -> "httpx.Client":
+    """Get the long-lived HTTP/2 connection pool used for Anthropic requests."""
+    import anthropic
+    import httpx
+    
+    return anthropic.DefaultHttpxClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+@st.cache_resource(max_entries=ANTHROPIC_CLIENT_CACHE_ENTRIES, ttl=ANTHROPIC_CLIENT_CACHE_TTL, show_spinner=False)
+def get_anthropic_client(api_key: str) -> "anthropic.Anthropic":
+    """
+    Get a cached Anthropic client for an API key, reusing pooled connections.
+    
+    Entries expire after ANTHROPIC_CLIENT_CACHE_TTL and at most
+    ANTHROPIC_CLIENT_CACHE_ENTRIES keys are kept. Evicting a client leaves the
+    shared HTTP pool from get_http_client() open.
+    """
+    import anthropic
+    
+    return anthropic.Anthropic(api_key=api_key, http_client=get_http_client(), max_retries=MAX_RETRIES)
+
+
+def get_api_key() -> str:
+    """Get the Claude API key from session state or the environment."""
     # First try session state (user-provided key)
     api_key = st.session_state.get("user_api_key")
     
@@ -130,7 +223,25 @@ def get_client():
     if not api_key:
         raise ValueError("No API key found. Please enter your Claude API key on the main page.")
     
-    return anthropic.Anthropic(api_key=api_key)
+    return api_key
+
+
+def get_client():
+    """Get configured Anthropic client using session state API key."""
+    return get_anthropic_client(get_api_key())
+
+
+def get_flashcards_max_tokens(num_cards: int) -> int:
+    """
+    Get a generation budget sized to the number of requested cards.
+    
+    Args:
+        num_cards: Number of flashcards to generate
+    
+    Returns:
+        max_tokens for the request, capped at MAX_TOKENS
+    """
+    return min(MAX_TOKENS, TOKENS_PER_CARD * num_cards + RESPONSE_OVERHEAD_TOKENS)
 
 
 def generate_flashcards_prompt(topic: str, num_cards: int, complexity: str) -> str:
@@ -324,63 +435,252 @@ Return ONLY valid JSON in this exact format (no markdown, no code blocks, just p
 Now generate exactly {num_cards} exceptional flashcards for "{topic}" at {complexity} level."""
 
 
-def parse_json_response(response_text: str) -> Optional[Dict]:
+# Characters that matter when scanning for balanced JSON objects
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+
+def _iter_json_objects(text: str) -> Iterator[str]:
+    """
+    Yield each top-level {...} object in text using a single linear scan.
+    
+    Tracks brace depth and skips braces inside JSON strings (e.g. code
+    snippets in answers), so there is no regex backtracking over the text.
+    
+    Args:
+        text: Text that may contain JSON objects mixed with prose
+    
+    Yields:
+        Substrings spanning balanced top-level objects
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped_index = -1
+    
+    for match in _JSON_STRUCTURE_RE.finditer(text):
+        index = match.start()
+        char = match.group()
+        
+        if in_string:
+            if index == escaped_index:
+                continue
+            if char == '\\':
+                escaped_index = index + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes in prose outside an object are not JSON strings
+            in_string = depth > 0
+        elif char == '{':
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:index + 1]
+
+
+class _StreamingCardParser:
+    """
+    Pick complete flashcard objects out of a response as it streams in.
+    
+    Uses the same scan as _iter_json_objects, but keeps its state between
+    chunks and yields objects nested one level inside the outer
+    {"flashcards": [...]} object as soon as their closing brace arrives.
+    """
+    
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escaped_index = -1
+    
+    def feed(self, chunk: str) -> List[Flashcard]:
+        """
+        Add streamed text and return the cards it completed.
+        
+        Args:
+            chunk: The next piece of response text
+        
+        Returns:
+            Cards whose JSON object was closed by this chunk, in order
+        """
+        self._text += chunk
+        cards = []
+        
+        for match in _JSON_STRUCTURE_RE.finditer(self._text, self._pos):
+            index = match.start()
+            char = match.group()
+            
+            if self._in_string:
+                if index == self._escaped_index:
+                    continue
+                if char == '\\':
+                    self._escaped_index = index + 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = self._depth > 0
+            elif char == '{':
+                self._depth += 1
+                if self._depth == 2:
+                    self._start = index
+            elif char == '}' and self._depth > 0:
+                if self._depth == 2:
+                    try:
+                        cards.append(_FLASHCARD_DECODER.decode(self._text[self._start:index + 1]))
+                    except msgspec.DecodeError:
+                        pass
+                self._depth -= 1
+        
+        self._pos = len(self._text)
+        return cards
+
+
+def _json_candidates(text: str) -> Iterator[str]:
+    """
+    Yield substrings of a response that may hold the flashcards JSON object.
+    
+    Args:
+        text: The cleaned response text from Claude
+    
+    Yields:
+        Candidate JSON strings, most likely first
+    """
+    # First, the whole response
+    yield text
+    
+    # JSON inside markdown code blocks (plain substring scans, no regex backtracking)
+    for fence in ('```json', '```'):
+        if fence in text:
+            _, _, rest = text.partition(fence)
+            body, _, _ = rest.partition('```')
+            yield body.strip()
+    
+    # Raw JSON objects embedded in prose
+    for obj in _iter_json_objects(text):
+        if '"flashcards"' in obj:
+            yield obj
+
+
+def _as_flashcard(item) -> Optional[Flashcard]:
+    """Validate one decoded card against the Flashcard schema, or None if it doesn't match."""
+    try:
+        return msgspec.convert(item, Flashcard)
+    except msgspec.ValidationError:
+        return None
+
+
+def parse_json_response(response_text: str) -> Optional[FlashcardResponse]:
     """
-    Safely parse JSON from Claude's response.
+    Safely parse and validate flashcard JSON from Claude's response.
     
     Args:
         response_text: The raw response text from Claude
     
     Returns:
-        Parsed JSON dictionary or None if parsing fails
+        Dictionary with a validated 'flashcards' list or None if parsing fails
     """
     # Clean the response text
     cleaned = response_text.strip()
+    candidates = list(_json_candidates(cleaned))
     
-    # Try to find JSON in the response
-    try:
-        # First, try direct parsing
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-    
-    # Try to extract JSON from markdown code blocks
-    json_patterns = [
-        r'```json\s*([\s\S]*?)\s*```',
-        r'```\s*([\s\S]*?)\s*```',
-    ]
-    
-    for pattern in json_patterns:
-        match = re.search(pattern, cleaned)
-        if match:
-            try:
-                json_str = match.group(1).strip()
-                return json.loads(json_str)
-            except (json.JSONDecodeError, IndexError):
-                continue
-    
-    # Try to find raw JSON object with flashcards
-    # Find the first { and last } to extract JSON
-    try:
-        first_brace = cleaned.find('{')
-        last_brace = cleaned.rfind('}')
-        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-            json_str = cleaned[first_brace:last_brace + 1]
-            return json.loads(json_str)
-    except json.JSONDecodeError:
-        pass
+    for candidate in candidates:
+        try:
+            return _RESPONSE_DECODER.decode(candidate)
+        except msgspec.DecodeError:
+            continue
     
-    # Last resort: try to find flashcards array directly
+    # Try to find flashcards array directly
     try:
         array_match = re.search(r'\[\s*\{[\s\S]*"question"[\s\S]*"answer"[\s\S]*\}\s*\]', cleaned)
         if array_match:
-            return {"flashcards": json.loads(array_match.group(0))}
-    except json.JSONDecodeError:
+            return {"flashcards": _FLASHCARD_LIST_DECODER.decode(array_match.group(0))}
+    except msgspec.DecodeError:
         pass
     
+    # Last resort: valid JSON where only some cards are malformed.
+    # Keep the cards that match the Flashcard schema instead of rejecting the whole response.
+    for candidate in candidates:
+        try:
+            data = msgspec.json.decode(candidate)
+        except msgspec.DecodeError:
+            continue
+        if isinstance(data, dict) and isinstance(data.get("flashcards"), list):
+            return {"flashcards": [card for card in map(_as_flashcard, data["flashcards"]) if card is not None]}
+    
     return None
 
 
+def _flashcards_request(topic: str, num_cards: int, complexity_level: str) -> Dict:
+    """Build the Messages API arguments for a flashcard generation call."""
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": get_flashcards_max_tokens(num_cards),
+        "messages": [{"role": "user", "content": generate_flashcards_prompt(topic, num_cards, complexity_level)}]
+    }
+
+
+def _flashcards_result(response) -> Dict:
+    """
+    Track the cost of a flashcard generation response and parse its cards.
+    
+    Args:
+        response: The Message returned by the Messages API
+    
+    Returns:
+        Dictionary with 'success' boolean and either 'flashcards' list or 'error' message;
+        'truncated' is True when the response hit max_tokens and only the
+        cards completed before the cut-off were kept
+    """
+    # Track costs
+    input_tokens = response.usage.input_tokens
+    output_tokens = response.usage.output_tokens
+    call_cost = update_cost_tracker(input_tokens, output_tokens)
+    
+    response_text = response.content[0].text
+    parsed = parse_json_response(response_text)
+    
+    # Cards were already validated against the Flashcard schema while decoding
+    flashcards = parsed["flashcards"] if parsed is not None else []
+    truncated = parsed is None and response.stop_reason == "max_tokens"
+    if truncated:
+        # Cut off at max_tokens: keep the cards whose JSON was completed
+        flashcards = _StreamingCardParser().feed(response_text)
+    
+    if flashcards:
+        cost_details = get_cost_details()
+        return {
+            "success": True,
+            "flashcards": flashcards,
+            "truncated": truncated,
+            "cost_info": {
+                "this_call": call_cost,
+                "total_spent": cost_details["total_spent"],
+                "remaining_budget": get_spending_limit() - cost_details["total_spent"]
+            }
+        }
+    elif parsed is not None:
+        return {
+            "success": False,
+            "error": "No valid flashcards found in response",
+            "raw_response": response_text[:500]  # First 500 chars for debugging
+        }
+    elif truncated:
+        return {
+            "success": False,
+            "error": "The AI response was cut off before all flashcards were written. Try generating fewer cards."
+        }
+    else:
+        return {
+            "success": False,
+            "error": f"Could not parse flashcards from AI response. Response starts with: {response_text[:200]}..."
+        }
+
+
 def generate_flashcards(topic: str, num_cards: int, complexity_level: str) -> Dict:
     """
     Generate flashcards using Claude API.
@@ -403,56 +703,8 @@ def generate_flashcards(topic: str, num_cards: int, complexity_level: str) -> Di
     
     try:
         client = get_client()
-        prompt = generate_flashcards_prompt(topic, num_cards, complexity_level)
-        
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        # Track costs
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-        call_cost = update_cost_tracker(input_tokens, output_tokens)
-        
-        response_text = response.content[0].text
-        parsed = parse_json_response(response_text)
-        
-        if parsed and "flashcards" in parsed:
-            flashcards = parsed["flashcards"]
-            
-            # Validate flashcard structure
-            valid_cards = []
-            for card in flashcards:
-                if "question" in card and "answer" in card:
-                    valid_cards.append({
-                        "question": card["question"],
-                        "answer": card["answer"]
-                    })
-            
-            if valid_cards:
-                cost_details = get_cost_details()
-                return {
-                    "success": True,
-                    "flashcards": valid_cards,
-                    "cost_info": {
-                        "this_call": call_cost,
-                        "total_spent": cost_details["total_spent"],
-                        "remaining_budget": get_spending_limit() - cost_details["total_spent"]
-                    }
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "No valid flashcards found in response",
-                    "raw_response": response_text[:500]  # First 500 chars for debugging
-                }
-        else:
-            return {
-                "success": False,
-                "error": f"Could not parse flashcards from AI response. Response starts with: {response_text[:200]}..."
-            }
+        response = client.messages.create(**_flashcards_request(topic, num_cards, complexity_level))
+        return _flashcards_result(response)
             
     except ValueError as e:
         return {
@@ -466,26 +718,175 @@ def generate_flashcards(topic: str, num_cards: int, complexity_level: str) -> Di
         }
 
 
-def generate_eli_explanation(question: str, answer: str, level: int) -> Dict:
+async def _stream_message(api_key: str, request: Dict, on_card: Callable[[Flashcard], Awaitable[None]]):
     """
-    Generate an ELI5 or ELI10 explanation for a flashcard.
+    Send one streaming Messages API request, reporting each flashcard as it arrives.
     
     Args:
-        question: The flashcard question
-        answer: The flashcard answer
-        level: Either 5 (ELI5) or 10 (ELI10)
+        api_key: The Claude API key
+        request: Messages API arguments
+        on_card: Coroutine function awaited with each card once its JSON is complete
     
     Returns:
-        Dictionary with 'success' boolean and either 'explanation' or 'error'
+        The complete Message
     """
-    # Check spending limit before making API call
+    import anthropic
+    
+    parser = _StreamingCardParser()
+    http_client = anthropic.DefaultAsyncHttpxClient(http2=True)
+    
+    async with anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, max_retries=MAX_RETRIES) as client:
+        async with client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                for card in parser.feed(text):
+                    await on_card(card)
+            return await stream.get_final_message()
+
+
+async def _create_messages_concurrently(api_key: str, requests: List[Dict]) -> List:
+    """
+    Send several Messages API requests concurrently over one HTTP/2 connection pool.
+    
+    Args:
+        api_key: The Claude API key
+        requests: Messages API arguments, one dict per request
+    
+    Returns:
+        Responses in request order; failed requests hold their exception instead
+    """
+    import anthropic
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    http_client = anthropic.DefaultAsyncHttpxClient(http2=True)
+    
+    async with anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client, max_retries=MAX_RETRIES) as client:
+        async def create(request: Dict):
+            async with semaphore:
+                return await client.messages.create(**request)
+        
+        return await asyncio.gather(*(create(request) for request in requests), return_exceptions=True)
+
+
+def _flashcards_results(responses: List) -> List[Dict]:
+    """
+    Turn Messages API responses (or the exceptions that replaced them) into result dicts.
+    
+    Cost tracking writes a shared file and reads session state, so this must
+    run on the Streamlit script thread, not on a worker thread.
+    
+    Args:
+        responses: Messages or exceptions, one per topic
+    
+    Returns:
+        One result dictionary per response, shaped like generate_flashcards()
+    """
+    results = []
+    for response in responses:
+        if isinstance(response, Exception):
+            results.append({
+                "success": False,
+                "error": f"API error: {str(response)}"
+            })
+        else:
+            results.append(_flashcards_result(response))
+    
+    return results
+
+
+@st.cache_resource
+def get_generation_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool that runs background flashcard generation."""
+    return ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="flashcards")
+
+
+class FlashcardJob:
+    """
+    Flashcard generation running on a background thread.
+    
+    The worker thread only makes the API calls. Spending checks, cost
+    tracking and parsing use session state, so they happen on the script
+    thread in start_flashcards_job() and results().
+    """
+    
+    def __init__(self, topics: List[str], num_cards: int, complexity_level: str):
+        self.topics = topics
+        self.num_cards = num_cards
+        self.complexity_level = complexity_level
+        # Cards streamed so far (single-topic jobs only)
+        self.cards: List[Flashcard] = []
+        self._error: Optional[str] = None
+        self._future: Optional[Future] = None
+    
+    def _run(self, api_key: str, requests: List[Dict]) -> List:
+        """
+        Make the API calls; runs on a worker thread.
+        
+        Never raises: an error that stops the calls (e.g. creating the client)
+        is returned in place of every response, like a failed single call.
+        """
+        try:
+            if len(requests) == 1:
+                async def add_card(card: Flashcard):
+                    self.cards.append(card)
+                
+                return [asyncio.run(_stream_message(api_key, requests[0], add_card))]
+            
+            return asyncio.run(_create_messages_concurrently(api_key, requests))
+        except Exception as e:
+            return [e for _ in requests]
+    
+    def done(self) -> bool:
+        """Whether the job has finished and results() can be called."""
+        return self._future is None or self._future.done()
+    
+    def results(self) -> List[Dict]:
+        """
+        Get the job's results. Call on the script thread once done() is True.
+        
+        Returns:
+            One result dictionary per topic, shaped like generate_flashcards()
+        """
+        if self._error is not None:
+            return [{"success": False, "error": self._error} for _ in self.topics]
+        return _flashcards_results(self._future.result())
+
+
+def start_flashcards_job(topics: List[str], num_cards: int, complexity_level: str) -> FlashcardJob:
+    """
+    Start generating flashcards for one or more topics on a background thread.
+    
+    A single topic is streamed, so FlashcardJob.cards fills in as cards
+    arrive; several topics are generated concurrently.
+    
+    Args:
+        topics: The topics to create flashcards for, one deck per topic
+        num_cards: Number of flashcards to generate per topic
+        complexity_level: Complexity level (Beginner, Intermediate, Advanced)
+    
+    Returns:
+        The running job; poll done() and then read results()
+    """
+    job = FlashcardJob(topics, num_cards, complexity_level)
+    
+    # Check spending limit before making API calls
     is_allowed, limit_message = check_spending_limit()
     if not is_allowed:
-        return {
-            "success": False,
-            "error": limit_message
-        }
+        job._error = limit_message
+        return job
     
+    try:
+        api_key = get_api_key()
+    except ValueError as e:
+        job._error = str(e)
+        return job
+    
+    requests = [_flashcards_request(topic, num_cards, complexity_level) for topic in topics]
+    job._future = get_generation_executor().submit(job._run, api_key, requests)
+    return job
+
+
+def _eli_request(question: str, answer: str, level: int) -> Dict:
+    """Build the Messages API arguments for an ELI5/ELI10 explanation call."""
     age_description = "5-year-old" if level == 5 else "10-year-old"
     
     prompt = f"""You are an expert at explaining complex topics to children.
@@ -503,56 +904,53 @@ Requirements:
 - Keep it concise (2-4 sentences for ELI5, 3-5 sentences for ELI10)
 
 Provide ONLY the explanation, no preamble or metadata."""
+    
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": ELI5_MAX_TOKENS if level == 5 else ELI10_MAX_TOKENS,
+        "messages": [{"role": "user", "content": prompt}]
+    }
 
-    try:
-        client = get_client()
-        
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        # Track costs
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-        call_cost = update_cost_tracker(input_tokens, output_tokens)
-        
-        explanation = response.content[0].text.strip()
-        
-        cost_details = get_cost_details()
-        return {
-            "success": True,
-            "explanation": explanation,
-            "cost_info": {
-                "this_call": call_cost,
-                "total_spent": cost_details["total_spent"],
-                "remaining_budget": get_spending_limit() - cost_details["total_spent"]
-            }
-        }
-        
-    except ValueError as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": f"API error: {str(e)}"
+
+def _text_result(response, key: str) -> Dict:
+    """
+    Track the cost of a single-text response and wrap its text in a result dict.
+    
+    Args:
+        response: The Message returned by the Messages API
+        key: Result key for the text ('explanation' or 'mnemonic')
+    
+    Returns:
+        Dictionary with 'success', the text under key, and 'cost_info'
+    """
+    # Track costs
+    input_tokens = response.usage.input_tokens
+    output_tokens = response.usage.output_tokens
+    call_cost = update_cost_tracker(input_tokens, output_tokens)
+    
+    cost_details = get_cost_details()
+    return {
+        "success": True,
+        key: response.content[0].text.strip(),
+        "cost_info": {
+            "this_call": call_cost,
+            "total_spent": cost_details["total_spent"],
+            "remaining_budget": get_spending_limit() - cost_details["total_spent"]
         }
+    }
 
 
-def generate_mnemonic(question: str, answer: str) -> Dict:
+def generate_eli_explanation(question: str, answer: str, level: int) -> Dict:
     """
-    Generate a memorable mnemonic, memory trick, or memory palace technique for a flashcard.
+    Generate an ELI5 or ELI10 explanation for a flashcard.
     
     Args:
         question: The flashcard question
         answer: The flashcard answer
+        level: Either 5 (ELI5) or 10 (ELI10)
     
     Returns:
-        Dictionary with 'success' boolean and either 'mnemonic' or 'error'
+        Dictionary with 'success' boolean and either 'explanation' or 'error'
     """
     # Check spending limit before making API call
     is_allowed, limit_message = check_spending_limit()
@@ -562,6 +960,25 @@ def generate_mnemonic(question: str, answer: str) -> Dict:
             "error": limit_message
         }
     
+    try:
+        client = get_client()
+        response = client.messages.create(**_eli_request(question, answer, level))
+        return _text_result(response, "explanation")
+        
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"API error: {str(e)}"
+        }
+
+
+def _mnemonic_request(question: str, answer: str) -> Dict:
+    """Build the Messages API arguments for a mnemonic call."""
     prompt = f"""You are a world-class memory champion and expert in mnemonic techniques.
 
 ═══════════════════════════════════════════════════════════════════
@@ -614,34 +1031,292 @@ OUTPUT FORMAT:
 [Optional: Add a specific mental image to reinforce the memory]
 
 Make it MEMORABLE, CREATIVE, and EFFECTIVE. The goal is that the user will NEVER forget this!"""
+    
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": 1024,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
 
+def generate_mnemonic(question: str, answer: str) -> Dict:
+    """
+    Generate a memorable mnemonic, memory trick, or memory palace technique for a flashcard.
+    
+    Args:
+        question: The flashcard question
+        answer: The flashcard answer
+    
+    Returns:
+        Dictionary with 'success' boolean and either 'mnemonic' or 'error'
+    """
+    # Check spending limit before making API call
+    is_allowed, limit_message = check_spending_limit()
+    if not is_allowed:
+        return {
+            "success": False,
+            "error": limit_message
+        }
+    
     try:
         client = get_client()
+        response = client.messages.create(**_mnemonic_request(question, answer))
+        return _text_result(response, "mnemonic")
         
-        response = client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        # Track costs
-        input_tokens = response.usage.input_tokens
-        output_tokens = response.usage.output_tokens
-        call_cost = update_cost_tracker(input_tokens, output_tokens)
-        
-        mnemonic = response.content[0].text.strip()
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"API error: {str(e)}"
+        }
+
+
+def _card_extras_request(question: str, answer: str) -> Dict:
+    """Build the Messages API arguments for a combined ELI5 + mnemonic call."""
+    prompt = f"""You are an expert at explaining complex topics to children and a world-class memory champion.
+
+Original Question: {question}
+Original Answer: {answer}
+
+Write two things for this flashcard:
+
+1. "eli5": Explain this concept as if you were talking to a 5-year-old child.
+   - Use simple words and short sentences
+   - Use analogies and examples from everyday life
+   - Avoid technical terms completely
+   - Make it engaging and fun
+   - Keep it concise (2-4 sentences)
+
+2. "mnemonic": Create a POWERFUL, MEMORABLE mnemonic device to help remember the answer forever,
+   using one or more proven techniques (acronym/acrostic, vivid visual association, rhyme/song,
+   story, method of loci, chunking, peg system, keyword method). Format it as:
+
+   **🧠 Technique Used:** [Name the technique(s)]
+
+   **✨ The Mnemonic:**
+   [Your creative mnemonic device - make it vivid, funny, or shocking for better recall]
+
+   **🎯 How It Works:**
+   [Brief explanation of how this helps remember the answer]
+
+   **💡 Visualization Tip:**
+   [Optional: Add a specific mental image to reinforce the memory]
+
+Return ONLY a JSON object with exactly these two string fields, no preamble or metadata:
+{{"eli5": "...", "mnemonic": "..."}}"""
+    
+    return {
+        "model": CLAUDE_MODEL,
+        "max_tokens": CARD_EXTRAS_MAX_TOKENS,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
+
+def _card_extras_result(response) -> Dict:
+    """
+    Track the cost of a combined ELI5 + mnemonic response and parse its JSON.
+    
+    Args:
+        response: The Message returned by the Messages API
+    
+    Returns:
+        Dictionary with 'success' and either 'explanation', 'mnemonic' and 'cost_info', or 'error'
+    """
+    call_cost = update_cost_tracker(response.usage.input_tokens, response.usage.output_tokens)
+    
+    extras = None
+    for candidate in _json_candidates(response.content[0].text.strip()):
+        try:
+            extras = _CARD_EXTRAS_DECODER.decode(candidate)
+            break
+        except msgspec.DecodeError:
+            continue
+    
+    if extras is None:
+        return {
+            "success": False,
+            "error": "Failed to parse the explanation and memory trick. Please try again."
+        }
+    
+    cost_details = get_cost_details()
+    return {
+        "success": True,
+        "explanation": extras["eli5"].strip(),
+        "mnemonic": extras["mnemonic"].strip(),
+        "cost_info": {
+            "this_call": call_cost,
+            "total_spent": cost_details["total_spent"],
+            "remaining_budget": get_spending_limit() - cost_details["total_spent"]
+        }
+    }
+
+
+def prefetch_card_extras(cards: List[Dict], skip: Optional[set] = None) -> Dict[tuple, Future]:
+    """
+    Start generating ELI5 explanations and mnemonics for cards on background threads.
+    
+    Only the API calls run on the workers. Pass each finished future to
+    prefetched_card_extra() on the script thread, which tracks its cost.
+    A card missing both gets a single combined call under the 'extras' kind.
+    
+    Args:
+        cards: Flashcard rows with 'id', 'question', 'answer', 'explanation_eli5' and 'mnemonic'
+        skip: (card_id, kind) keys that are already in flight
+    
+    Returns:
+        Futures keyed by (card_id, kind), kind being 'eli5', 'mnemonic' or 'extras';
+        empty if the budget is used up or there is no API key
+    """
+    is_allowed, _ = check_spending_limit()
+    if not is_allowed:
+        return {}
+    
+    try:
+        client = get_client()
+    except ValueError:
+        return {}
+    
+    executor = get_generation_executor()
+    skip = skip or set()
+    futures = {}
+    
+    for card in cards:
+        if (card["id"], "extras") in skip:
+            continue
+        need_eli5 = not card.get("explanation_eli5") and (card["id"], "eli5") not in skip
+        need_mnemonic = not card.get("mnemonic") and (card["id"], "mnemonic") not in skip
         
-        cost_details = get_cost_details()
+        if need_eli5 and need_mnemonic:
+            request = _card_extras_request(card["question"], card["answer"])
+            futures[(card["id"], "extras")] = executor.submit(client.messages.create, **request)
+        elif need_eli5:
+            request = _eli_request(card["question"], card["answer"], 5)
+            futures[(card["id"], "eli5")] = executor.submit(client.messages.create, **request)
+        elif need_mnemonic:
+            request = _mnemonic_request(card["question"], card["answer"])
+            futures[(card["id"], "mnemonic")] = executor.submit(client.messages.create, **request)
+    
+    return futures
+
+
+def prefetched_card_extra(kind: str, future: Future) -> Dict:
+    """
+    Turn a finished prefetch future into a result dict. Call on the script thread.
+    
+    Args:
+        kind: 'eli5', 'mnemonic' or 'extras'
+        future: A future returned by prefetch_card_extras(), waited on if still running
+    
+    Returns:
+        Dictionary shaped like generate_eli_explanation() or generate_mnemonic();
+        for 'extras' it carries both 'explanation' and 'mnemonic'
+    """
+    try:
+        response = future.result()
+    except Exception as e:
         return {
-            "success": True,
-            "mnemonic": mnemonic,
-            "cost_info": {
-                "this_call": call_cost,
-                "total_spent": cost_details["total_spent"],
-                "remaining_budget": get_spending_limit() - cost_details["total_spent"]
-            }
+            "success": False,
+            "error": f"API error: {str(e)}"
+        }
+    
+    if kind == "extras":
+        return _card_extras_result(response)
+    return _text_result(response, "explanation" if kind == "eli5" else "mnemonic")
+
+
+def submit_card_extras_batch(cards: List[Dict]) -> Dict:
+    """
+    Submit ELI5 explanations and mnemonics for a whole deck as one Message Batch.
+    
+    Batches are processed asynchronously at half the standard price, so
+    this suits pre-generating a deck rather than answering a click.
+    
+    Args:
+        cards: Flashcard rows with 'id', 'question', 'answer', 'explanation_eli5' and 'mnemonic'
+    
+    Returns:
+        Dictionary with 'success' boolean and either 'batch_id' and
+        'num_requests' or 'error'; 'batch_id' is None if nothing was missing
+    """
+    # Check spending limit before making API call
+    is_allowed, limit_message = check_spending_limit()
+    if not is_allowed:
+        return {
+            "success": False,
+            "error": limit_message
         }
+    
+    requests = []
+    for card in cards:
+        if not card.get("explanation_eli5"):
+            requests.append({
+                "custom_id": f"{card['id']}-eli5",
+                "params": _eli_request(card["question"], card["answer"], 5)
+            })
+        if not card.get("mnemonic"):
+            requests.append({
+                "custom_id": f"{card['id']}-mnemonic",
+                "params": _mnemonic_request(card["question"], card["answer"])
+            })
+    
+    if not requests:
+        return {"success": True, "batch_id": None, "num_requests": 0}
+    
+    try:
+        batch = get_client().messages.batches.create(requests=requests)
+        return {"success": True, "batch_id": batch.id, "num_requests": len(requests)}
+    
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"API error: {str(e)}"
+        }
+
+
+def get_card_extras_batch(batch_id: str) -> Dict:
+    """
+    Check a batch from submit_card_extras_batch() and collect its results once it has ended.
+    
+    Args:
+        batch_id: The Message Batch ID
+    
+    Returns:
+        Dictionary with 'success' and 'done' booleans. When done it also holds
+        'extras' ({card_id: {'explanation_eli5': ..., 'mnemonic': ...}}),
+        'failed' (number of requests without a result) and 'cost_info'
+    """
+    try:
+        client = get_client()
+        batch = client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return {"success": True, "done": False}
+        
+        extras: Dict[int, Dict[str, str]] = {}
+        failed = 0
+        input_tokens = 0
+        output_tokens = 0
         
+        for entry in client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                failed += 1
+                continue
+            message = entry.result.message
+            input_tokens += message.usage.input_tokens
+            output_tokens += message.usage.output_tokens
+            
+            card_id, _, kind = entry.custom_id.partition("-")
+            column = "explanation_eli5" if kind == "eli5" else "mnemonic"
+            extras.setdefault(int(card_id), {})[column] = message.content[0].text.strip()
+    
     except ValueError as e:
         return {
             "success": False,
@@ -652,3 +1327,17 @@ Make it MEMORABLE, CREATIVE, and EFFECTIVE. The goal is that the user will NEVER
             "success": False,
             "error": f"API error: {str(e)}"
         }
+    
+    call_cost = update_cost_tracker(input_tokens, output_tokens, BATCH_PRICE_MULTIPLIER)
+    cost_details = get_cost_details()
+    return {
+        "success": True,
+        "done": True,
+        "extras": extras,
+        "failed": failed,
+        "cost_info": {
+            "this_call": call_cost,
+            "total_spent": cost_details["total_spent"],
+            "remaining_budget": get_spending_limit() - cost_details["total_spent"]
+        }
+    }
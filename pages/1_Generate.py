@@ -3,52 +3,12 @@ Generate Flashcards - Minimal ChatGPT-style Interface
 """
 
 import streamlit as st
-import os
-from dotenv import load_dotenv
-from database import init_database, create_cardset, save_flashcards_bulk, get_all_cardsets
-from flashcard_generator import generate_flashcards
-from utils import get_base_css, render_header
+from auth import require_auth
+from database import init_database, create_cardset_with_flashcards, count_cardsets_cached
+from utils import get_page_css, render_header, select_cardset, set_dark_mode
 
-load_dotenv()
-
-# Auth check
-def check_auth():
-    correct_password = os.getenv("APP_PASSWORD", "")
-    if not correct_password:
-        try:
-            correct_password = st.secrets.get("APP_PASSWORD", "")
-        except:
-            correct_password = ""
-    if correct_password and not st.session_state.get("password_correct", False):
-        st.switch_page("app.py")
-        return False
-    if not st.session_state.get("user_api_key"):
-        st.switch_page("app.py")
-        return False
-    return True
-
-if not check_auth():
-    st.stop()
-
-init_database()
-
-# Page config
-st.set_page_config(
-    page_title="Generate | Smart FlashCards",
-    page_icon="🧠",
-    layout="centered",
-    initial_sidebar_state="collapsed"
-)
-
-# Initialize dark mode
-if 'dark_mode' not in st.session_state:
-    st.session_state.dark_mode = True
-
-# Apply theme CSS
-st.markdown(get_base_css(st.session_state.dark_mode), unsafe_allow_html=True)
-
-# Page-specific CSS
-st.markdown("""
+# Page-specific CSS; get_page_css merges it with the base theme and caches the result
+_PAGE_CSS = """
 <style>
     .block-container {
         padding-top: 1rem;
@@ -106,24 +66,46 @@ st.markdown("""
         font-size: 0.9rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Light mode uses the page CSS as-is
+_PAGE_CSS_LIGHT = _PAGE_CSS
 
 # Dark mode specific overrides
-if st.session_state.dark_mode:
-    st.markdown("""
-    <style>
-        .success-card {
-            background: linear-gradient(135deg, #238636 0%, #1a7f37 100%) !important;
-            box-shadow: 0 0 20px rgba(35, 134, 54, 0.3);
-        }
-        .preview-card {
-            background: #161b22 !important;
-            border-left-color: #238636 !important;
-        }
-        .preview-q { color: #c9d1d9 !important; }
-        .preview-a { color: #8b949e !important; }
-    </style>
-    """, unsafe_allow_html=True)
+_PAGE_CSS_DARK = _PAGE_CSS + """<style>
+    .success-card {
+        background: linear-gradient(135deg, #238636 0%, #1a7f37 100%) !important;
+        box-shadow: 0 0 20px rgba(35, 134, 54, 0.3);
+    }
+    .preview-card {
+        background: #161b22 !important;
+        border-left-color: #238636 !important;
+    }
+    .preview-q { color: #c9d1d9 !important; }
+    .preview-a { color: #8b949e !important; }
+</style>
+"""
+
+# Auth check
+require_auth()
+
+init_database()
+
+# Page config
+st.set_page_config(
+    page_title="Generate | Smart FlashCards",
+    page_icon="🧠",
+    layout="centered",
+    initial_sidebar_state="collapsed"
+)
+
+# Initialize dark mode
+if 'dark_mode' not in st.session_state:
+    st.session_state.dark_mode = True
+dark = st.session_state.dark_mode
+
+# Apply theme + page CSS in one element
+st.markdown(get_page_css(dark, _PAGE_CSS_DARK if dark else _PAGE_CSS_LIGHT), unsafe_allow_html=True)
 
 # Initialize state
 if 'generated_cards' not in st.session_state:
@@ -136,10 +118,8 @@ if 'selected_topic' not in st.session_state:
 # Minimal navigation in sidebar
 with st.sidebar:
     st.markdown("### 🎨 Theme")
-    dark_mode = st.toggle("🌙 Dark Mode", value=st.session_state.dark_mode, key="dark_toggle_gen")
-    if dark_mode != st.session_state.dark_mode:
-        st.session_state.dark_mode = dark_mode
-        st.rerun()
+    st.toggle("🌙 Dark Mode", value=dark, key="dark_toggle_gen",
+              on_change=set_dark_mode, args=("dark_toggle_gen",))
     
     st.markdown("---")
     st.markdown("### Navigation")
@@ -167,7 +147,7 @@ if 'selected_topic' in st.session_state and st.session_state.selected_topic:
 # Topic input
 topic = st.text_area(
     "Topic",
-    placeholder="e.g., Python decorators, The French Revolution, Quantum physics...",
+    placeholder="e.g., Python decorators, The French Revolution, Quantum physics...\nOne topic per line creates several decks at once",
     label_visibility="collapsed",
     height=80,
     key="topic_input"
@@ -192,69 +172,148 @@ with col2:
         help="Complexity level of the content"
     )
 
-# Generate button
+def render_preview_card(card: dict) -> str:
+    """Build the HTML for one card in the preview."""
+    question = card['question']
+    answer = card['answer']
+    q_more = '...' if len(question) > 100 else ''
+    a_more = '...' if len(answer) > 150 else ''
+    return f"""
+    <div class="preview-card">
+        <div class="preview-q">Q: {question[:100]}{q_more}</div>
+        <div class="preview-a">A: {answer[:150]}{a_more}</div>
+    </div>
+    """
+
+
+@st.fragment(run_every=0.5)
+def show_generation_progress():
+    """Poll the background generation job, rerunning the whole page once it finishes."""
+    job = st.session_state.get("generation_job")
+    if job is None or job.done():
+        st.rerun()
+    
+    if len(job.topics) > 1:
+        st.markdown(f"✍️ Creating {job.num_cards} flashcards for {len(job.topics)} topics...")
+    elif job.cards:
+        st.markdown(f"✍️ Writing flashcards... **{len(job.cards)}** of {job.num_cards}")
+        st.markdown("".join(render_preview_card(c) for c in job.cards[-3:]), unsafe_allow_html=True)
+    else:
+        st.markdown(f"✍️ Creating {job.num_cards} flashcards...")
+
+
+# Generate button (disabled while a deck is being generated; a finished job
+# still in session state is handled below on this same run)
 st.markdown("<br>", unsafe_allow_html=True)
-generate_clicked = st.button("Generate →", type="primary", use_container_width=True)
+running_job = st.session_state.get("generation_job")
+generate_clicked = st.button(
+    "Generate →", type="primary", use_container_width=True,
+    disabled=running_job is not None and not running_job.done()
+)
 
-# Handle generation
+# Start generation on a background thread; the page stays responsive while it runs
 if generate_clicked:
-    if not topic or len(topic.strip()) < 3:
+    # Deferred so the Anthropic SDK is only imported once generation is requested
+    from flashcard_generator import start_flashcards_job
+    
+    # One deck per non-empty line
+    topics = [line.strip() for line in topic.splitlines() if line.strip()]
+    
+    if not topics or any(len(t) < 3 for t in topics):
         st.error("Please enter a topic (at least 3 characters)")
     else:
-        with st.spinner(f"Creating {num_cards} flashcards..."):
-            result = generate_flashcards(topic.strip(), num_cards, complexity)
-            
+        st.session_state.generation_job = start_flashcards_job(topics, num_cards, complexity)
+        st.rerun()
+
+# Handle a running or finished generation job
+job = st.session_state.get("generation_job")
+if job is not None and not job.done():
+    show_generation_progress()
+elif job is not None:
+    del st.session_state.generation_job
+    results = job.results()
+    
+    with st.spinner("Saving..."):
+        created = []
+        for deck_topic, result in zip(job.topics, results):
             if result["success"]:
-                flashcards = result["flashcards"]
-                
                 # Save to database
-                cardset_id = create_cardset(topic.strip(), len(flashcards), complexity)
-                save_flashcards_bulk(cardset_id, topic.strip(), flashcards, complexity)
-                
-                st.session_state.generated_cards = flashcards
-                st.session_state.last_topic = topic.strip()
-                st.session_state.last_cardset_id = cardset_id
-                
-                # Success message
-                st.markdown(f"""
-                <div class="success-card">
-                    <h3>✅ Created {len(flashcards)} flashcards</h3>
-                    <p>{topic.strip()}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Cost info
-                if "cost_info" in result:
-                    cost = result["cost_info"]
-                    st.caption(f"💰 Cost: ${cost['this_call']:.4f} | Remaining: ${cost['remaining_budget']:.2f}")
-                
-                # Preview first 3 cards
-                st.markdown("### Preview")
-                for i, card in enumerate(flashcards[:3]):
-                    st.markdown(f"""
-                    <div class="preview-card">
-                        <div class="preview-q">Q: {card['question'][:100]}{'...' if len(card['question']) > 100 else ''}</div>
-                        <div class="preview-a">A: {card['answer'][:150]}{'...' if len(card['answer']) > 150 else ''}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                if len(flashcards) > 3:
-                    st.caption(f"+ {len(flashcards) - 3} more cards")
-                
-                # Navigation buttons
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    if st.button("📚 View All Decks", use_container_width=True):
-                        st.switch_page("pages/2_Decks.py")
-                with col_b:
-                    if st.button("📖 Start Reviewing", use_container_width=True, type="primary"):
-                        st.session_state.selected_cardset = cardset_id
-                        st.switch_page("pages/3_Review.py")
-            else:
+                cardset_id = create_cardset_with_flashcards(deck_topic, result["flashcards"], job.complexity_level)
+                created.append((deck_topic, cardset_id, result))
+                if result["truncated"]:
+                    st.warning(
+                        f"The response for \"{deck_topic}\" was cut off, so only "
+                        f"{len(result['flashcards'])} of {job.num_cards} cards were saved."
+                    )
+            elif len(job.topics) == 1:
                 st.error(f"Failed: {result['error']}")
+            else:
+                st.error(f"Failed ({deck_topic}): {result['error']}")
+        
+        if created:
+            # The first new deck is previewed and opened by "Start Reviewing"
+            _, cardset_id, result = created[0]
+            flashcards = result["flashcards"]
+            
+            st.session_state.generated_cards = flashcards
+            st.session_state.last_topic = ", ".join(deck_topic for deck_topic, _, _ in created)
+            st.session_state.last_cardset_id = cardset_id
+            st.session_state.last_deck_count = len(created)
+            st.session_state.last_card_count = sum(len(r["flashcards"]) for _, _, r in created)
+            st.session_state.last_cost_info = {
+                "this_call": sum(r["cost_info"]["this_call"] for _, _, r in created),
+                "remaining_budget": created[-1][2]["cost_info"]["remaining_budget"]
+            }
+            
+            # Build the preview of the first 3 cards once; reruns reuse the finished HTML
+            st.session_state.preview_html = "".join(render_preview_card(card) for card in flashcards[:3])
+
+# Last generated deck (kept across reruns). Nothing below writes these keys,
+# so they are read from session state once into a plain dict.
+last = {
+    key: st.session_state.get(key)
+    for key in ("generated_cards", "last_topic", "last_cardset_id", "last_deck_count",
+                "last_card_count", "last_cost_info", "preview_html")
+}
+
+if last["generated_cards"] is not None:
+    flashcards = last["generated_cards"]
+    
+    deck_count = last["last_deck_count"] or 1
+    card_count = last["last_card_count"] or len(flashcards)
+    
+    # Success message
+    st.markdown(f"""
+    <div class="success-card">
+        <h3>✅ Created {card_count} flashcards{f' in {deck_count} decks' if deck_count > 1 else ''}</h3>
+        <p>{last['last_topic']}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Cost info
+    if last["last_cost_info"]:
+        cost = last["last_cost_info"]
+        st.caption(f"💰 Cost: ${cost['this_call']:.4f} | Remaining: ${cost['remaining_budget']:.2f}")
+    
+    # Preview first 3 cards
+    st.markdown("### Preview")
+    st.markdown(last["preview_html"], unsafe_allow_html=True)
+    
+    if len(flashcards) > 3:
+        st.caption(f"+ {len(flashcards) - 3} more cards")
+    
+    # Navigation buttons
+    col_a, col_b = st.columns(2)
+    with col_a:
+        if st.button("📚 View All Decks", use_container_width=True):
+            st.switch_page("pages/2_Decks.py")
+    with col_b:
+        if st.button("📖 Start Reviewing", use_container_width=True, type="primary"):
+            select_cardset(last["last_cardset_id"])
+            st.switch_page("pages/3_Review.py")
 
 # Suggestions (when no cards generated)
-if st.session_state.generated_cards is None:
+if last["generated_cards"] is None:
     st.markdown("---")
     st.markdown("### 💡 Try these topics")
     
@@ -276,9 +335,9 @@ if st.session_state.generated_cards is None:
                 st.rerun()
 
 # Quick link to decks
-existing_sets = get_all_cardsets()
-if existing_sets:
+num_sets = count_cardsets_cached()
+if num_sets:
     st.markdown("---")
-    st.markdown(f"📚 You have **{len(existing_sets)}** deck{'s' if len(existing_sets) > 1 else ''} → ", unsafe_allow_html=True)
+    st.markdown(f"📚 You have **{num_sets}** deck{'s' if num_sets > 1 else ''} → ", unsafe_allow_html=True)
     if st.button("View My Decks"):
         st.switch_page("pages/2_Decks.py")
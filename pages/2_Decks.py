@@ -3,51 +3,14 @@ Decks Page - View all flashcard sets as icons/cards
 """
 
 import streamlit as st
-import os
-from dotenv import load_dotenv
-from database import init_database, get_all_cardsets, delete_cardset
-from utils import get_complexity_emoji, get_base_css, render_header
+from auth import require_auth
+from database import init_database, get_cardsets_cached, get_cardsets_stats_cached, delete_cardsets
+from utils import COMPLEXITY_EMOJI, DEFAULT_COMPLEXITY_EMOJI, get_page_css, render_header, select_cardset, set_dark_mode
 
-load_dotenv()
+DECKS_PER_PAGE = 12
 
-# Auth check
-def check_auth():
-    correct_password = os.getenv("APP_PASSWORD", "")
-    if not correct_password:
-        try:
-            correct_password = st.secrets.get("APP_PASSWORD", "")
-        except:
-            correct_password = ""
-    if correct_password and not st.session_state.get("password_correct", False):
-        st.switch_page("app.py")
-        return False
-    if not st.session_state.get("user_api_key"):
-        st.switch_page("app.py")
-        return False
-    return True
-
-if not check_auth():
-    st.stop()
-
-init_database()
-
-# Page config
-st.set_page_config(
-    page_title="My Decks | Smart FlashCards",
-    page_icon="🧠",
-    layout="centered",
-    initial_sidebar_state="collapsed"
-)
-
-# Initialize dark mode
-if 'dark_mode' not in st.session_state:
-    st.session_state.dark_mode = True
-
-# Apply theme CSS
-st.markdown(get_base_css(st.session_state.dark_mode), unsafe_allow_html=True)
-
-# Page-specific CSS
-st.markdown("""
+# Page-specific CSS; get_page_css merges it with the base theme and caches the result
+_PAGE_CSS = """
 <style>
     .block-container {
         padding-top: 1rem;
@@ -69,6 +32,22 @@ st.markdown("""
         transform: translateY(-2px);
     }
     
+    /* Deck grid */
+    .deck-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 12px;
+        margin-bottom: 1rem;
+    }
+    .deck-grid .deck-card {
+        margin: 0;
+    }
+    @media (max-width: 640px) {
+        .deck-grid {
+            grid-template-columns: 1fr;
+        }
+    }
+    
     /* Deck icon */
     .deck-icon {
         font-size: 2.5rem;
@@ -110,56 +89,74 @@ st.markdown("""
         opacity: 0.5;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Dark mode specific overrides
-if st.session_state.dark_mode:
-    st.markdown("""
-    <style>
-        .deck-card {
-            background: #161b22 !important;
-            border: 1px solid #30363d !important;
-        }
-        .deck-card:hover {
-            border-color: #238636 !important;
-            box-shadow: 0 4px 16px rgba(35, 134, 54, 0.2) !important;
-        }
-        .deck-topic { color: #c9d1d9 !important; }
-        .deck-meta { color: #8b949e !important; }
-        .deck-badge { 
-            background: #21262d !important; 
-            color: #8b949e !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown("""
-    <style>
-        .deck-card {
-            background: #ffffff !important;
-            border: 1px solid #e0e0e0 !important;
-        }
-        .deck-card:hover {
-            border-color: #10a37f !important;
-            box-shadow: 0 4px 16px rgba(16,163,127,0.15) !important;
-        }
-        .deck-topic { color: #1a1a1a !important; }
-        .deck-meta { color: #666666 !important; }
-        .deck-badge { 
-            background: #f0f0f0 !important; 
-            color: #555555 !important;
-        }
-        .empty-state { color: #666666 !important; }
-    </style>
-    """, unsafe_allow_html=True)
+# Theme specific overrides
+_PAGE_CSS_DARK = _PAGE_CSS + """<style>
+    .deck-card {
+        background: #161b22 !important;
+        border: 1px solid #30363d !important;
+    }
+    .deck-card:hover {
+        border-color: #238636 !important;
+        box-shadow: 0 4px 16px rgba(35, 134, 54, 0.2) !important;
+    }
+    .deck-topic { color: #c9d1d9 !important; }
+    .deck-meta { color: #8b949e !important; }
+    .deck-badge { 
+        background: #21262d !important; 
+        color: #8b949e !important;
+    }
+</style>
+"""
+
+_PAGE_CSS_LIGHT = _PAGE_CSS + """<style>
+    .deck-card {
+        background: #ffffff !important;
+        border: 1px solid #e0e0e0 !important;
+    }
+    .deck-card:hover {
+        border-color: #10a37f !important;
+        box-shadow: 0 4px 16px rgba(16,163,127,0.15) !important;
+    }
+    .deck-topic { color: #1a1a1a !important; }
+    .deck-meta { color: #666666 !important; }
+    .deck-badge { 
+        background: #f0f0f0 !important; 
+        color: #555555 !important;
+    }
+    .empty-state { color: #666666 !important; }
+</style>
+"""
+
+# Auth check
+require_auth()
+
+init_database()
+
+# Page config
+st.set_page_config(
+    page_title="My Decks | Smart FlashCards",
+    page_icon="🧠",
+    layout="centered",
+    initial_sidebar_state="collapsed"
+)
+
+# Initialize dark mode
+if 'dark_mode' not in st.session_state:
+    st.session_state.dark_mode = True
+dark = st.session_state.dark_mode
+if 'decks_page' not in st.session_state:
+    st.session_state.decks_page = 0
+
+# Apply theme + page CSS in one element
+st.markdown(get_page_css(dark, _PAGE_CSS_DARK if dark else _PAGE_CSS_LIGHT), unsafe_allow_html=True)
 
 # Sidebar navigation
 with st.sidebar:
     st.markdown("### 🎨 Theme")
-    dark_mode = st.toggle("🌙 Dark Mode", value=st.session_state.dark_mode, key="dark_toggle_decks")
-    if dark_mode != st.session_state.dark_mode:
-        st.session_state.dark_mode = dark_mode
-        st.rerun()
+    st.toggle("🌙 Dark Mode", value=dark, key="dark_toggle_decks",
+              on_change=set_dark_mode, args=("dark_toggle_decks",))
     
     st.markdown("---")
     st.markdown("### Navigation")
@@ -171,14 +168,30 @@ with st.sidebar:
     st.markdown("---")
     st.caption(f"💰 Limit: ${st.session_state.get('user_spending_limit', 5.0):.2f}")
 
+def render_deck_card(cardset: dict) -> str:
+    """Build the HTML for one deck card in the grid."""
+    emoji = COMPLEXITY_EMOJI.get(cardset['complexity_level'], DEFAULT_COMPLEXITY_EMOJI)
+    # No blank or indented lines: the joined grid must stay a single HTML block for markdown
+    return (
+        '<div class="deck-card">'
+        f'<div class="deck-icon">{emoji}</div>'
+        f'<div class="deck-topic">{cardset["topic"]}</div>'
+        '<div class="deck-meta">'
+        f'<span class="deck-badge">{cardset["num_cards"]} cards</span>'
+        f'<span class="deck-badge">{cardset["complexity_level"]}</span>'
+        '</div>'
+        '</div>'
+    )
+
+
 # Main content - Header
 render_header()
 st.caption("Your flashcard collections")
 
-# Get all cardsets
-cardsets = get_all_cardsets()
+# Deck and card totals; only the visible page of decks is fetched below
+num_decks, total_cards = get_cardsets_stats_cached()
 
-if not cardsets:
+if not num_decks:
     # Empty state
     st.markdown("""
     <div class="empty-state">
@@ -192,60 +205,84 @@ if not cardsets:
         st.switch_page("pages/1_Generate.py")
 else:
     # Display stats
-    total_cards = sum(cs['num_cards'] for cs in cardsets)
-    st.markdown(f"**{len(cardsets)}** decks • **{total_cards}** cards total")
+    st.markdown(f"**{num_decks}** decks • **{total_cards}** cards total")
     
     st.markdown("---")
     
-    # Display decks in grid
-    cols = st.columns(2)
-    
-    for i, cardset in enumerate(cardsets):
-        with cols[i % 2]:
-            emoji = get_complexity_emoji(cardset['complexity_level'])
-            
-            # Deck card container
-            with st.container():
-                # Card visual
-                st.markdown(f"""
-                <div class="deck-card">
-                    <div class="deck-icon">{emoji}</div>
-                    <div class="deck-topic">{cardset['topic']}</div>
-                    <div class="deck-meta">
-                        <span class="deck-badge">{cardset['num_cards']} cards</span>
-                        <span class="deck-badge">{cardset['complexity_level']}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Action buttons
-                btn_col1, btn_col2 = st.columns(2)
-                
-                with btn_col1:
-                    if st.button("📖 Study", key=f"study_{cardset['cardset_id']}", use_container_width=True, type="primary"):
-                        st.session_state.selected_cardset = cardset['cardset_id']
-                        st.switch_page("pages/3_Review.py")
-                
-                with btn_col2:
-                    if st.button("🗑️", key=f"del_{cardset['cardset_id']}", use_container_width=True):
-                        st.session_state.delete_confirm = cardset['cardset_id']
-                        st.rerun()
-                
-                # Delete confirmation
-                if st.session_state.get('delete_confirm') == cardset['cardset_id']:
-                    st.warning(f"Delete **{cardset['topic']}**?")
-                    confirm_col1, confirm_col2 = st.columns(2)
-                    with confirm_col1:
-                        if st.button("Yes, delete", key=f"confirm_{cardset['cardset_id']}", type="primary"):
-                            delete_cardset(cardset['cardset_id'])
-                            del st.session_state.delete_confirm
-                            st.rerun()
-                    with confirm_col2:
-                        if st.button("Cancel", key=f"cancel_{cardset['cardset_id']}"):
-                            del st.session_state.delete_confirm
-                            st.rerun()
-                
-                st.markdown("<br>", unsafe_allow_html=True)
+    # Only fetch the decks on the visible page
+    num_pages = (num_decks + DECKS_PER_PAGE - 1) // DECKS_PER_PAGE
+    page = min(st.session_state.decks_page, num_pages - 1)
+    page_sets = get_cardsets_cached(DECKS_PER_PAGE, page * DECKS_PER_PAGE)
+    
+    # Display decks in grid - one HTML block for all cards
+    st.markdown(
+        '<div class="deck-grid">' + "".join(render_deck_card(cs) for cs in page_sets) + '</div>',
+        unsafe_allow_html=True
+    )
+    
+    # One form for all deck actions instead of a button pair per deck
+    decks_by_id = {cs['cardset_id']: cs for cs in page_sets}
+    with st.form("deck_actions"):
+        form_col1, form_col2 = st.columns([3, 1])
+        with form_col1:
+            selected_id = st.selectbox(
+                "Deck",
+                list(decks_by_id),
+                format_func=lambda cardset_id: decks_by_id[cardset_id]['topic']
+            )
+        with form_col2:
+            action = st.radio("Action", ["📖 Study", "🗑️ Delete"], label_visibility="hidden")
+        submitted = st.form_submit_button("Go →", type="primary", use_container_width=True)
+    
+    if submitted:
+        if action == "📖 Study":
+            select_cardset(selected_id)
+            st.switch_page("pages/3_Review.py")
+        else:
+            st.session_state.delete_confirm = [selected_id]
+    
+    # Several decks at once
+    with st.expander("🗑️ Delete several decks"):
+        with st.form("delete_selected"):
+            selected_ids = st.multiselect(
+                "Decks to delete",
+                list(decks_by_id),
+                format_func=lambda cardset_id: decks_by_id[cardset_id]['topic']
+            )
+            if st.form_submit_button("Delete selected", use_container_width=True) and selected_ids:
+                st.session_state.delete_confirm = selected_ids
+    
+    # Delete confirmation
+    confirm_ids = [cardset_id for cardset_id in st.session_state.get('delete_confirm', []) if cardset_id in decks_by_id]
+    if confirm_ids:
+        if len(confirm_ids) == 1:
+            st.warning(f"Delete **{decks_by_id[confirm_ids[0]]['topic']}**?")
+        else:
+            st.warning(f"Delete **{len(confirm_ids)}** decks: " + ", ".join(decks_by_id[cardset_id]['topic'] for cardset_id in confirm_ids) + "?")
+        confirm_col1, confirm_col2 = st.columns(2)
+        with confirm_col1:
+            if st.button("Yes, delete", type="primary", use_container_width=True):
+                delete_cardsets(confirm_ids)
+                del st.session_state.delete_confirm
+                st.rerun()
+        with confirm_col2:
+            if st.button("Cancel", use_container_width=True):
+                del st.session_state.delete_confirm
+                st.rerun()
+    
+    # Pagination
+    if num_pages > 1:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("← Prev", disabled=page == 0, use_container_width=True):
+                st.session_state.decks_page = page - 1
+                st.rerun()
+        with page_col:
+            st.caption(f"Page {page + 1} of {num_pages}")
+        with next_col:
+            if st.button("Next →", disabled=page >= num_pages - 1, use_container_width=True):
+                st.session_state.decks_page = page + 1
+                st.rerun()
     
     # Create new deck button
     st.markdown("---")
@@ -4,51 +4,44 @@ Review Flashcards - With Dark Mode & Swipe Gestures
 
 import streamlit as st
 import streamlit.components.v1 as components
-import os
 import random
-from dotenv import load_dotenv
+from datetime import datetime
+from auth import require_auth
 from database import (
     init_database, 
-    get_all_cardsets, 
-    get_flashcards_by_set,
-    get_cardset_by_id,
-    update_review_stats,
-    init_spaced_repetition_table,
-    update_card_progress,
-    get_next_intervals,
-    get_explanation,
+    get_all_cardsets_cached,
+    get_flashcards_by_set_cached,
+    record_reviews_in_background,
+    update_card_progress_in_background,
+    get_cards_progress,
+    compute_next_intervals,
     save_explanation,
-    get_mnemonic,
     save_mnemonic,
-    get_review_order,
+    save_card_extras,
     set_review_order,
 )
-from flashcard_generator import generate_eli_explanation, generate_mnemonic
-from utils import get_complexity_emoji, get_base_css, render_header
+from utils import format_deck_label, get_page_css, render_header, select_cardset, set_dark_mode
 
-load_dotenv()
+# flashcard_generator is imported where it is first needed, so reviewing
+# cards that already have their extras never loads it
+
+# Cards ahead of the current one whose ELI5 and memory trick are prefetched
+PREFETCH_AHEAD = 3
+
+# How often a pending "Pregenerate all" batch is checked
+PREGENERATE_POLL_SECONDS = 15
+
+# Answer reveals are buffered and written in one go once either limit is hit
+REVIEW_STATS_FLUSH_SIZE = 10
+REVIEW_STATS_FLUSH_SECONDS = 60
+
+# Revealing the same card again within this window is not counted as another review
+REVIEW_DEBOUNCE_SECONDS = 60
 
 # Auth check
-def check_auth():
-    correct_password = os.getenv("APP_PASSWORD", "")
-    if not correct_password:
-        try:
-            correct_password = st.secrets.get("APP_PASSWORD", "")
-        except:
-            correct_password = ""
-    if correct_password and not st.session_state.get("password_correct", False):
-        st.switch_page("app.py")
-        return False
-    if not st.session_state.get("user_api_key"):
-        st.switch_page("app.py")
-        return False
-    return True
-
-if not check_auth():
-    st.stop()
+require_auth()
 
 init_database()
-init_spaced_repetition_table()
 
 # Page config
 st.set_page_config(
@@ -64,13 +57,8 @@ if 'dark_mode' not in st.session_state:
 
 dark = st.session_state.dark_mode
 
-# Apply base theme CSS
-st.markdown(get_base_css(dark), unsafe_allow_html=True)
-
-# Dynamic CSS based on theme
-def get_theme_css():
-    if dark:
-        return """
+# Page CSS per theme
+_PAGE_CSS_DARK = """
         <style>
             /* Dark mode base */
             .stApp {
@@ -94,26 +82,22 @@ def get_theme_css():
                 color: #c9d1d9 !important;
             }
             
-            /* Progress bar dark */
-            .progress-bar {
-                height: 4px;
+            /* Progress bar dark (st.progress) */
+            [data-testid="stProgress"] {
+                margin-bottom: 1.5rem;
+            }
+            [data-testid="stProgress"] p {
+                text-align: center;
+                font-size: 0.85rem;
+                color: #8b949e !important;
+            }
+            [data-testid="stProgress"] [role="progressbar"] > div > div {
                 background: #30363d;
-                border-radius: 2px;
-                margin-bottom: 8px;
             }
-            .progress-fill {
-                height: 100%;
+            [data-testid="stProgress"] [role="progressbar"] > div > div > div {
                 background: #10a37f;
-                border-radius: 2px;
-                transition: width 0.3s;
                 box-shadow: 0 0 10px #10a37f;
             }
-            .progress-text {
-                text-align: center;
-                font-size: 0.85rem;
-                color: #8b949e;
-                margin-bottom: 1.5rem;
-            }
             
             /* 3D Flip Card Container */
             .flip-card {
@@ -230,6 +214,12 @@ def get_theme_css():
                 color: #8b949e;
                 text-align: center;
             }
+            /* One row of interval labels lined up over the four rating columns */
+            .rating-labels {
+                display: grid;
+                grid-template-columns: repeat(4, 1fr);
+                gap: 1rem;
+            }
             
             /* Buttons dark */
             .stButton > button {
@@ -267,9 +257,9 @@ def get_theme_css():
                 color: #c9d1d9 !important;
             }
         </style>
-        """
-    else:
-        return """
+"""
+
+_PAGE_CSS_LIGHT = """
         <style>
             #MainMenu {visibility: hidden;}
             footer {visibility: hidden;}
@@ -280,24 +270,20 @@ def get_theme_css():
                 max-width: 700px;
             }
             
-            /* Progress bar */
-            .progress-bar {
-                height: 4px;
-                background: #e0e0e0;
-                border-radius: 2px;
-                margin-bottom: 8px;
-            }
-            .progress-fill {
-                height: 100%;
-                background: #10a37f;
-                border-radius: 2px;
-                transition: width 0.3s;
+            /* Progress bar (st.progress) */
+            [data-testid="stProgress"] {
+                margin-bottom: 1.5rem;
             }
-            .progress-text {
+            [data-testid="stProgress"] p {
                 text-align: center;
                 font-size: 0.85rem;
                 color: #888;
-                margin-bottom: 1.5rem;
+            }
+            [data-testid="stProgress"] [role="progressbar"] > div > div {
+                background: #e0e0e0;
+            }
+            [data-testid="stProgress"] [role="progressbar"] > div > div > div {
+                background: #10a37f;
             }
             
             /* 3D Flip Card Container */
@@ -427,6 +413,12 @@ def get_theme_css():
                 color: #888;
                 text-align: center;
             }
+            /* One row of interval labels lined up over the four rating columns */
+            .rating-labels {
+                display: grid;
+                grid-template-columns: repeat(4, 1fr);
+                gap: 1rem;
+            }
             
             /* Buttons */
             .stButton > button {
@@ -448,9 +440,9 @@ def get_theme_css():
                 border-radius: 8px;
             }
         </style>
-        """
+"""
 
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+st.markdown(get_page_css(dark, _PAGE_CSS_DARK if dark else _PAGE_CSS_LIGHT), unsafe_allow_html=True)
 
 # Swipe gesture JavaScript (touch, mouse, keyboard) - using components.html for JS execution
 components.html("""
@@ -578,19 +570,87 @@ components.html("""
 # Initialize session state
 if 'current_card_index' not in st.session_state:
     st.session_state.current_card_index = 0
-if 'show_answer' not in st.session_state:
-    st.session_state.show_answer = False
+if 'view_state' not in st.session_state:
+    # What the current card shows: 'question', 'answer', 'eli5' or 'mnemonic'
+    st.session_state.view_state = 'question'
 if 'selected_cardset' not in st.session_state:
     st.session_state.selected_cardset = None
 if 'session_stats' not in st.session_state:
     st.session_state.session_stats = {'again': 0, 'hard': 0, 'good': 0, 'easy': 0}
-if 'show_eli5' not in st.session_state:
-    st.session_state.show_eli5 = False
-if 'show_mnemonic' not in st.session_state:
-    st.session_state.show_mnemonic = False
+if 'deck_done' not in st.session_state:
+    st.session_state.deck_done = False
+if 'pending_stats' not in st.session_state:
+    # (card_id, reviewed_at) for answer reveals not yet written to the database
+    st.session_state.pending_stats = []
+if 'last_revealed' not in st.session_state:
+    # card_id -> when its last counted answer reveal happened
+    st.session_state.last_revealed = {}
+if 'rating_clicks' not in st.session_state:
+    # Bumped on every rating so each card render gets fresh rating button keys
+    st.session_state.rating_clicks = 0
+    st.session_state.last_click_id = None
+if 'progress_by_id' not in st.session_state:
+    # card_id -> spaced repetition progress (None if never rated); only a rated card's entry changes
+    st.session_state.progress_by_id = {}
+if 'db_writes' not in st.session_state:
+    # Futures for review writes running on the background DB thread
+    st.session_state.db_writes = []
+if 'prefetch' not in st.session_state:
+    # (card_id, 'eli5' | 'mnemonic' | 'extras') -> running Future, or None once handled
+    st.session_state.prefetch = {}
+
 
-# Get all cardsets
-cardsets = get_all_cardsets()
+def flush_review_stats():
+    """Write buffered answer reveals to the database in the background."""
+    if st.session_state.pending_stats:
+        st.session_state.db_writes.append(record_reviews_in_background(st.session_state.pending_stats))
+        st.session_state.pending_stats = []
+
+
+def take_prefetched(card_id, kind):
+    """
+    Collect a prefetched ELI5 or mnemonic, waiting for it if still running, and save it.
+    
+    A combined ELI5 + mnemonic prefetch for the card is used when there is no
+    prefetch for just this kind; both of its texts are saved.
+    
+    Returns:
+        The result dict, or None if nothing was prefetched for this card
+    """
+    for key in ((card_id, kind), (card_id, 'extras')):
+        future = st.session_state.prefetch.get(key)
+        if future is not None:
+            break
+    else:
+        return None
+    st.session_state.prefetch[key] = None
+    
+    from flashcard_generator import prefetched_card_extra
+    
+    result = prefetched_card_extra(key[1], future)
+    if result['success']:
+        if key[1] == 'extras':
+            save_card_extras({card_id: {'explanation_eli5': result['explanation'], 'mnemonic': result['mnemonic']}})
+        elif kind == 'eli5':
+            save_explanation(card_id, 'eli5', result['explanation'])
+        else:
+            save_mnemonic(card_id, result['mnemonic'])
+    return result
+
+
+# Report review writes that failed on the background DB thread since the last run
+for future in [f for f in st.session_state.db_writes if f.done()]:
+    st.session_state.db_writes.remove(future)
+    if future.exception() is not None:
+        st.toast(f"⚠️ Could not save review progress: {future.exception()}")
+
+# Save prefetches that finished since the last run (this also records their cost)
+for (prefetch_card_id, prefetch_kind), future in list(st.session_state.prefetch.items()):
+    if future is not None and future.done():
+        take_prefetched(prefetch_card_id, prefetch_kind)
+
+# Get all cardsets (cached across reruns; cleared when decks change)
+cardsets = get_all_cardsets_cached()
 
 if not cardsets:
     render_header()
@@ -602,10 +662,8 @@ if not cardsets:
 # Sidebar navigation
 with st.sidebar:
     st.markdown("### 🎨 Theme")
-    dark_mode = st.toggle("🌙 Dark Mode", value=st.session_state.dark_mode, key="dark_toggle")
-    if dark_mode != st.session_state.dark_mode:
-        st.session_state.dark_mode = dark_mode
-        st.rerun()
+    st.toggle("🌙 Dark Mode", value=st.session_state.dark_mode, key="dark_toggle",
+              on_change=set_dark_mode, args=("dark_toggle",))
     
     st.markdown("---")
     st.markdown("### Navigation")
@@ -614,29 +672,41 @@ with st.sidebar:
     if st.button("📚 My Decks", use_container_width=True):
         st.switch_page("pages/2_Decks.py")
     
+    st.toggle(
+        "⚡ Prefetch explanations",
+        key="prefetch_extras",
+        help=f"Generate the simple explanation and memory trick for this card and the next {PREFETCH_AHEAD} cards "
+             "in the background while you review. Uses your API budget even if you never open them."
+    )
+    
     st.markdown("---")
     st.markdown("### 📚 Select Deck")
     
-    cardset_options = {
-        f"{get_complexity_emoji(cs['complexity_level'])} {cs['topic'][:25]}{'...' if len(cs['topic']) > 25 else ''}": cs['cardset_id']
+    deck_labels = {
+        cs['cardset_id']: format_deck_label(cs['topic'], cs['complexity_level'])
         for cs in cardsets
     }
     
-    selected_option = st.selectbox(
+    # First visit, or the studied deck was deleted: fall back to the first deck
+    if st.session_state.selected_cardset not in deck_labels:
+        select_cardset(cardsets[0]['cardset_id'])
+    # Coming from another page: preselect the deck chosen there
+    if st.session_state.get("review_deck") not in deck_labels:
+        st.session_state.review_deck = st.session_state.selected_cardset
+    
+    def on_deck_change():
+        flush_review_stats()
+        select_cardset(st.session_state.review_deck)
+    
+    st.selectbox(
         "Deck",
-        options=list(cardset_options.keys()),
-        index=0,
+        options=list(deck_labels),
+        format_func=deck_labels.get,
+        key="review_deck",
+        on_change=on_deck_change,
         label_visibility="collapsed"
     )
     
-    selected_cardset_id = cardset_options[selected_option]
-    
-    if st.session_state.selected_cardset != selected_cardset_id:
-        st.session_state.selected_cardset = selected_cardset_id
-        st.session_state.current_card_index = 0
-        st.session_state.show_answer = False
-        st.session_state.session_stats = {'again': 0, 'hard': 0, 'good': 0, 'easy': 0}
-    
     st.markdown("---")
     
     # Session stats
@@ -647,18 +717,66 @@ with st.sidebar:
         st.caption(f"🟢 {stats['good']} good • 🔴 {stats['again']} again")
 
 # Get flashcards
-flashcards_original = get_flashcards_by_set(st.session_state.selected_cardset)
-cardset_info = get_cardset_by_id(st.session_state.selected_cardset)
+flashcards_original = get_flashcards_by_set_cached(st.session_state.selected_cardset)
 
 if not flashcards_original:
     st.error("No flashcards found in this deck.")
     st.stop()
 
+
+def pregenerate_panel():
+    """Sidebar control that pre-generates every ELI5 and memory trick in the deck as one batch."""
+    batch = st.session_state.get("pregenerate_batch")
+    
+    if batch is None:
+        # Outcome of a batch that finished on the previous run
+        failed, total = st.session_state.pop("pregenerate_failed", (0, 0))
+        if failed:
+            st.warning(f"⚠️ {failed} of {total} pregenerated explanations failed; "
+                       "those can still be created on the card")
+        if st.button("⚡ Pregenerate all", use_container_width=True,
+                     help="Create every simple explanation and memory trick for this deck in one "
+                          "batch at half the usual price. Usually ready within minutes."):
+            from flashcard_generator import submit_card_extras_batch
+            result = submit_card_extras_batch(flashcards_original)
+            if not result['success']:
+                st.error(f"Error: {result['error']}")
+            elif result['batch_id'] is None:
+                st.caption("✅ Every card already has both")
+            else:
+                st.session_state.pregenerate_batch = {"id": result['batch_id'], "num_requests": result['num_requests']}
+                st.rerun()
+        return
+    
+    from flashcard_generator import get_card_extras_batch
+    
+    with st.status(f"⚡ Pregenerating {batch['num_requests']} explanations...", state="running"):
+        result = get_card_extras_batch(batch['id'])
+        if not result['success']:
+            st.error(f"Error: {result['error']}")
+            del st.session_state.pregenerate_batch
+        elif result['done']:
+            save_card_extras(result['extras'])
+            del st.session_state.pregenerate_batch
+            st.session_state.pregenerate_failed = (result['failed'], batch['num_requests'])
+            st.rerun()
+        else:
+            st.caption("You can keep reviewing while this runs.")
+
+
+# Poll only while a batch is pending
+with st.sidebar:
+    st.fragment(
+        run_every=PREGENERATE_POLL_SECONDS if st.session_state.get("pregenerate_batch") else None
+    )(pregenerate_panel)()
+
 # Render header
 render_header()
 
 # Review order toggle - stored per cardset in database
-current_order = get_review_order(st.session_state.selected_cardset)
+# (read from the cached cardset rows, which include review_order when the column exists)
+current_cardset = next(cs for cs in cardsets if cs['cardset_id'] == st.session_state.selected_cardset)
+current_order = current_cardset.get('review_order') or "ordered"
 is_randomized = (current_order == "random")
 
 # Shuffle key for this cardset
@@ -685,244 +803,37 @@ if new_is_randomized != is_randomized:
     # Don't reset card index - continue from current position
     st.rerun()
 
-# Apply randomization if needed - use the SAVED value from database
-if is_randomized:
-    # Create stable shuffled order for this session
-    if shuffle_key not in st.session_state:
-        shuffled = flashcards_original.copy()
-        # Use a seed based on cardset_id for reproducible shuffle within session
-        random.seed(hash(st.session_state.selected_cardset + str(id(st.session_state))))
-        random.shuffle(shuffled)
-        random.seed()  # Reset seed
-        st.session_state[shuffle_key] = shuffled
-    flashcards = st.session_state[shuffle_key]
-else:
-    # Clear any cached shuffle when switching to ordered
-    if shuffle_key in st.session_state:
-        del st.session_state[shuffle_key]
-    flashcards = flashcards_original
 
-total_cards = len(flashcards)
-current_index = st.session_state.current_card_index
+def go_to_card(index):
+    """Show the question side of the card at the given position."""
+    st.session_state.current_card_index = index
+    st.session_state.view_state = 'question'
 
-# Ensure index is within bounds
-if current_index >= total_cards:
-    current_index = 0
-    st.session_state.current_card_index = 0
 
-current_card = flashcards[current_index]
+def reveal_answer(card_id):
+    """Flip to the answer and buffer the review for the database."""
+    st.session_state.view_state = 'answer'
+    now = datetime.now()
+    last = st.session_state.last_revealed.get(card_id)
+    if last is not None and (now - last).total_seconds() < REVIEW_DEBOUNCE_SECONDS:
+        return
+    st.session_state.last_revealed[card_id] = now
+    
+    pending = st.session_state.pending_stats
+    pending.append((card_id, now.isoformat()))
+    oldest = datetime.fromisoformat(pending[0][1])
+    if len(pending) >= REVIEW_STATS_FLUSH_SIZE or (now - oldest).total_seconds() >= REVIEW_STATS_FLUSH_SECONDS:
+        flush_review_stats()
 
-# Find original card number (position in original ordered list)
-original_card_num = None
-if is_randomized:
-    for i, card in enumerate(flashcards_original):
-        if card['id'] == current_card['id']:
-            original_card_num = i + 1
-            break
 
-# Progress bar
-progress_pct = ((current_index + 1) / total_cards) * 100
-progress_text = f"{current_index + 1} / {total_cards}"
-if is_randomized and original_card_num:
-    progress_text += f" &nbsp;•&nbsp; Card #{original_card_num}"
-
-st.markdown(f"""
-<div class="progress-bar">
-    <div class="progress-fill" style="width: {progress_pct}%"></div>
-</div>
-<div class="progress-text">{progress_text}</div>
-""", unsafe_allow_html=True)
-
-# Get intervals for rating buttons
-intervals = get_next_intervals(current_card['id'])
-
-# Display flashcard with flip animation
-flipped_class = "flipped" if st.session_state.show_answer else ""
-
-st.markdown(f"""
-<div class="flip-card">
-    <div class="flip-card-inner {flipped_class}">
-        <div class="flip-card-front">
-            <div class="q-card">
-                <div class="card-label">Question</div>
-                <div class="card-content">{current_card['question']}</div>
-            </div>
-        </div>
-        <div class="flip-card-back">
-            <div class="a-card">
-                <div class="card-label">Answer</div>
-                <div class="card-content">{current_card['answer']}</div>
-            </div>
-        </div>
-    </div>
-</div>
-""", unsafe_allow_html=True)
-
-if not st.session_state.show_answer:
-    # Controls hint for question side
-    st.markdown("""
-    <div class="swipe-hint">
-        ⌨️ <b>Space</b> or <b>Arrow keys</b> to reveal • 📱 Swipe or drag to flip
-    </div>
-    """, unsafe_allow_html=True)
-    
-    if st.button("Show Answer", use_container_width=True, type="primary"):
-        st.session_state.show_answer = True
-        update_review_stats(current_card['id'])
-        st.rerun()
-else:
-    # Controls hint
-    st.markdown("""
-    <div class="swipe-hint">
-        ⌨️ <b>Space</b> flip • <b>1-4</b> or <b>←↓↑→</b> rate • 🖱️ Drag or 📱 Swipe
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # ELI5 / Mnemonic buttons
-    eli_col, mnem_col = st.columns(2)
-    
-    with eli_col:
-        if st.button("🧒 Explain Simply", use_container_width=True):
-            st.session_state.show_eli5 = not st.session_state.show_eli5
-            st.session_state.show_mnemonic = False
-            st.rerun()
-    
-    with mnem_col:
-        if st.button("🧠 Memory Trick", use_container_width=True):
-            st.session_state.show_mnemonic = not st.session_state.show_mnemonic
-            st.session_state.show_eli5 = False
-            st.rerun()
-    
-    # Show ELI5
-    if st.session_state.show_eli5:
-        card_id = current_card['id']
-        existing_eli5 = get_explanation(card_id, 'eli5')
-        
-        if existing_eli5:
-            st.markdown(f"""
-            <div class="eli5-card">
-                <div class="card-label">🧒 Explain Like I'm 5</div>
-                <div class="card-content">{existing_eli5}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            with st.spinner("Creating simple explanation..."):
-                result = generate_eli_explanation(
-                    current_card['question'], 
-                    current_card['answer'], 
-                    level=5
-                )
-                
-                if result['success']:
-                    save_explanation(card_id, 'eli5', result['explanation'])
-                    st.markdown(f"""
-                    <div class="eli5-card">
-                        <div class="card-label">🧒 Explain Like I'm 5</div>
-                        <div class="card-content">{result['explanation']}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.caption(f"💰 ${result['cost_info']['this_call']:.4f}")
-                else:
-                    st.error(f"Error: {result['error']}")
-    
-    # Show Mnemonic
-    if st.session_state.show_mnemonic:
-        card_id = current_card['id']
-        existing_mnemonic = get_mnemonic(card_id)
-        
-        if existing_mnemonic:
-            st.markdown(f"""
-            <div class="mnem-card">
-                <div class="card-label">🧠 Memory Trick</div>
-                <div class="card-content">{existing_mnemonic}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            with st.spinner("Creating memory trick..."):
-                result = generate_mnemonic(
-                    current_card['question'], 
-                    current_card['answer']
-                )
-                
-                if result['success']:
-                    save_mnemonic(card_id, result['mnemonic'])
-                    st.markdown(f"""
-                    <div class="mnem-card">
-                        <div class="card-label">🧠 Memory Trick</div>
-                        <div class="card-content">{result['mnemonic']}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.caption(f"💰 ${result['cost_info']['this_call']:.4f}")
-                else:
-                    st.error(f"Error: {result['error']}")
-    
-    # Rating buttons
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown("**How well did you remember?**")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    def rate_card(rating):
-        update_card_progress(current_card['id'], rating)
-        st.session_state.session_stats[rating] += 1
-        if rating != 'again' and current_index < total_cards - 1:
-            st.session_state.current_card_index += 1
-        st.session_state.show_answer = False
-        st.session_state.show_eli5 = False
-        st.session_state.show_mnemonic = False
-        st.rerun()
-    
-    with col1:
-        st.markdown(f'<p class="rating-label">{intervals["again"]}</p>', unsafe_allow_html=True)
-        if st.button("🔴 Again", use_container_width=True, key="btn_again"):
-            rate_card('again')
-    
-    with col2:
-        st.markdown(f'<p class="rating-label">{intervals["hard"]}</p>', unsafe_allow_html=True)
-        if st.button("🟠 Hard", use_container_width=True, key="btn_hard"):
-            rate_card('hard')
-    
-    with col3:
-        st.markdown(f'<p class="rating-label">{intervals["good"]}</p>', unsafe_allow_html=True)
-        if st.button("🟢 Good", use_container_width=True, key="btn_good"):
-            rate_card('good')
-    
-    with col4:
-        st.markdown(f'<p class="rating-label">{intervals["easy"]}</p>', unsafe_allow_html=True)
-        if st.button("🔵 Easy", use_container_width=True, key="btn_easy"):
-            rate_card('easy')
-
-# Navigation
-st.markdown("<br>", unsafe_allow_html=True)
-nav_col1, nav_col2, nav_col3 = st.columns([1, 1, 1])
-
-with nav_col1:
-    if st.button("← Prev", use_container_width=True, disabled=(current_index == 0)):
-        st.session_state.current_card_index -= 1
-        st.session_state.show_answer = False
-        st.session_state.show_eli5 = False
-        st.session_state.show_mnemonic = False
-        st.rerun()
-
-with nav_col2:
-    if st.session_state.show_answer:
-        if st.button("Flip", use_container_width=True):
-            st.session_state.show_answer = False
-            st.session_state.show_eli5 = False
-            st.session_state.show_mnemonic = False
-            st.rerun()
+def toggle_extra(kind):
+    """Toggle the ELI5 or memory trick panel, closing the other one."""
+    st.session_state.view_state = 'answer' if st.session_state.view_state == kind else kind
 
-with nav_col3:
-    if st.button("Next →", use_container_width=True, disabled=(current_index == total_cards - 1)):
-        st.session_state.current_card_index += 1
-        st.session_state.show_answer = False
-        st.session_state.show_eli5 = False
-        st.session_state.show_mnemonic = False
-        st.rerun()
 
-# Completion
-if current_index == total_cards - 1 and st.session_state.show_answer:
-    st.markdown("---")
+def render_completion():
+    """Deck summary shown once the last card has been rated, in place of the card."""
+    flush_review_stats()
     st.success("🎉 Deck completed!")
     
     stats = st.session_state.session_stats
@@ -935,11 +846,277 @@ if current_index == total_cards - 1 and st.session_state.show_answer:
     
     col_a, col_b = st.columns(2)
     with col_a:
-        if st.button("🔁 Study Again", use_container_width=True, type="primary"):
+        if st.button("🔁 Study Again", use_container_width=True, type="primary", key="btn_study_again"):
             st.session_state.current_card_index = 0
-            st.session_state.show_answer = False
+            st.session_state.view_state = 'question'
+            st.session_state.deck_done = False
             st.session_state.session_stats = {'again': 0, 'hard': 0, 'good': 0, 'easy': 0}
             st.rerun()
     with col_b:
-        if st.button("📚 All Decks", use_container_width=True):
+        if st.button("📚 All Decks", use_container_width=True, key="btn_all_decks"):
             st.switch_page("pages/2_Decks.py")
+
+
+@st.fragment
+def render_card(is_randomized):
+    """
+    Card, answer tools and navigation.
+    
+    Flipping, moving between cards and opening the ELI5 or memory trick panels
+    only rerun this fragment; rating a card reruns the whole page.
+    """
+    if st.session_state.deck_done:
+        render_completion()
+        return
+    
+    # Loaded here rather than passed in so fragment reruns see newly saved extras
+    flashcards_original = get_flashcards_by_set_cached(st.session_state.selected_cardset)
+    
+    # Apply randomization if needed - use the SAVED value from database
+    if is_randomized:
+        # Create stable shuffled order for this session
+        if shuffle_key not in st.session_state:
+            shuffled = list(range(len(flashcards_original)))
+            # Use a seed based on cardset_id for reproducible shuffle within session
+            random.seed(hash(st.session_state.selected_cardset + str(id(st.session_state))))
+            random.shuffle(shuffled)
+            random.seed()  # Reset seed
+            st.session_state[shuffle_key] = shuffled
+        # Only the order (positions in the deck) is kept in session state; the cards
+        # themselves come from the cached query so saved explanations and mnemonics show up right away
+        order = [i for i in st.session_state[shuffle_key] if i < len(flashcards_original)]
+        flashcards = [flashcards_original[i] for i in order]
+    else:
+        # Clear any cached shuffle when switching to ordered
+        if shuffle_key in st.session_state:
+            del st.session_state[shuffle_key]
+        flashcards = flashcards_original
+
+    total_cards = len(flashcards)
+    current_index = st.session_state.current_card_index
+
+    # Ensure index is within bounds
+    if current_index >= total_cards:
+        current_index = 0
+        st.session_state.current_card_index = 0
+
+    current_card = flashcards[current_index]
+
+    # Original card number (position in original ordered list)
+    original_card_num = order[current_index] + 1 if is_randomized else None
+
+    # Progress bar
+    progress_text = f"{current_index + 1} / {total_cards}"
+    if is_randomized and original_card_num:
+        progress_text += f" • Card #{original_card_num}"
+
+    st.progress((current_index + 1) / total_cards, text=progress_text)
+
+    # Display flashcard with flip animation
+    show_answer = st.session_state.view_state != 'question'
+    flipped_class = "flipped" if show_answer else ""
+
+    st.markdown(f"""
+    <div class="flip-card">
+        <div class="flip-card-inner {flipped_class}">
+            <div class="flip-card-front">
+                <div class="q-card">
+                    <div class="card-label">Question</div>
+                    <div class="card-content">{current_card['question']}</div>
+                </div>
+            </div>
+            <div class="flip-card-back">
+                <div class="a-card">
+                    <div class="card-label">Answer</div>
+                    <div class="card-content">{current_card['answer']}</div>
+                </div>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not show_answer:
+        # Controls hint for question side
+        st.markdown("""
+        <div class="swipe-hint">
+            ⌨️ <b>Space</b> or <b>Arrow keys</b> to reveal • 📱 Swipe or drag to flip
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.button("Show Answer", use_container_width=True, type="primary", key="btn_show_answer",
+                  on_click=reveal_answer, args=(current_card['id'],))
+    else:
+        # Controls hint
+        st.markdown("""
+        <div class="swipe-hint">
+            ⌨️ <b>Space</b> flip • <b>1-4</b> or <b>←↓↑→</b> rate • 🖱️ Drag or 📱 Swipe
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Start generating this card's and the next cards' extras while this answer
+        # is being read; cards that already have them are skipped
+        if st.session_state.get("prefetch_extras"):
+            from flashcard_generator import prefetch_card_extras
+            upcoming = flashcards[current_index:current_index + 1 + PREFETCH_AHEAD]
+            st.session_state.prefetch.update(prefetch_card_extras(upcoming, skip=set(st.session_state.prefetch)))
+        
+        # ELI5 / Mnemonic buttons
+        eli_col, mnem_col = st.columns(2)
+        
+        with eli_col:
+            st.button("🧒 Explain Simply", use_container_width=True, key="btn_eli5", on_click=toggle_extra, args=('eli5',))
+        
+        with mnem_col:
+            st.button("🧠 Memory Trick", use_container_width=True, key="btn_mnemonic", on_click=toggle_extra, args=('mnemonic',))
+        
+        # Show ELI5
+        if st.session_state.view_state == 'eli5':
+            card_id = current_card['id']
+            existing_eli5 = current_card.get('explanation_eli5')
+            
+            if existing_eli5:
+                st.markdown(f"""
+                <div class="eli5-card">
+                    <div class="card-label">🧒 Explain Like I'm 5</div>
+                    <div class="card-content">{existing_eli5}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                with st.spinner("Creating simple explanation..."):
+                    result = take_prefetched(card_id, 'eli5')
+                    if result is None:
+                        from flashcard_generator import generate_eli_explanation
+                        result = generate_eli_explanation(
+                            current_card['question'], 
+                            current_card['answer'], 
+                            level=5
+                        )
+                        if result['success']:
+                            save_explanation(card_id, 'eli5', result['explanation'])
+                    
+                    if result['success']:
+                        st.markdown(f"""
+                        <div class="eli5-card">
+                            <div class="card-label">🧒 Explain Like I'm 5</div>
+                            <div class="card-content">{result['explanation']}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.caption(f"💰 ${result['cost_info']['this_call']:.4f}")
+                    else:
+                        st.error(f"Error: {result['error']}")
+        
+        # Show Mnemonic
+        if st.session_state.view_state == 'mnemonic':
+            card_id = current_card['id']
+            existing_mnemonic = current_card.get('mnemonic')
+            
+            if existing_mnemonic:
+                st.markdown(f"""
+                <div class="mnem-card">
+                    <div class="card-label">🧠 Memory Trick</div>
+                    <div class="card-content">{existing_mnemonic}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                with st.spinner("Creating memory trick..."):
+                    result = take_prefetched(card_id, 'mnemonic')
+                    if result is None:
+                        from flashcard_generator import generate_mnemonic
+                        result = generate_mnemonic(
+                            current_card['question'], 
+                            current_card['answer']
+                        )
+                        if result['success']:
+                            save_mnemonic(card_id, result['mnemonic'])
+                    
+                    if result['success']:
+                        st.markdown(f"""
+                        <div class="mnem-card">
+                            <div class="card-label">🧠 Memory Trick</div>
+                            <div class="card-content">{result['mnemonic']}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.caption(f"💰 ${result['cost_info']['this_call']:.4f}")
+                    else:
+                        st.error(f"Error: {result['error']}")
+        
+        # Progress only changes when a card is rated here, so it is loaded once
+        # per deck and the rating intervals are computed from it
+        if current_card['id'] not in st.session_state.progress_by_id:
+            # One query covers the whole deck
+            progress = get_cards_progress([card['id'] for card in flashcards])
+            for card in flashcards:
+                st.session_state.progress_by_id.setdefault(card['id'], progress.get(card['id']))
+        intervals = compute_next_intervals(st.session_state.progress_by_id[current_card['id']])
+        
+        # Rating buttons
+        # Heading and interval labels go out as one element above the buttons
+        labels = "".join(
+            f'<p class="rating-label">{intervals[rating]}</p>'
+            for rating in ('again', 'hard', 'good', 'easy')
+        )
+        st.markdown(f"""
+        <br><p><strong>How well did you remember?</strong></p>
+        <div class="rating-labels">{labels}</div>
+        """, unsafe_allow_html=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        # Clicks queued against an earlier render carry a stale key and are dropped
+        click_id = f"{current_card['id']}_{st.session_state.rating_clicks}"
+        
+        def rate_card(rating):
+            if st.session_state.last_click_id == click_id:
+                return
+            st.session_state.last_click_id = click_id
+            st.session_state.rating_clicks += 1
+            # The new progress is computed here; saving it doesn't hold up the next card
+            progress, write = update_card_progress_in_background(
+                current_card['id'], rating, st.session_state.progress_by_id[current_card['id']]
+            )
+            st.session_state.progress_by_id[current_card['id']] = progress
+            st.session_state.db_writes.append(write)
+            st.session_state.session_stats[rating] += 1
+            if rating != 'again':
+                if current_index < total_cards - 1:
+                    st.session_state.current_card_index += 1
+                else:
+                    st.session_state.deck_done = True
+            st.session_state.view_state = 'question'
+            # Full rerun so the session stats in the sidebar update too
+            st.rerun()
+        
+        with col1:
+            if st.button("🔴 Again", use_container_width=True, key=f"rate_again_{click_id}"):
+                rate_card('again')
+        
+        with col2:
+            if st.button("🟠 Hard", use_container_width=True, key=f"rate_hard_{click_id}"):
+                rate_card('hard')
+        
+        with col3:
+            if st.button("🟢 Good", use_container_width=True, key=f"rate_good_{click_id}"):
+                rate_card('good')
+        
+        with col4:
+            if st.button("🔵 Easy", use_container_width=True, key=f"rate_easy_{click_id}"):
+                rate_card('easy')
+
+    # Navigation
+    st.markdown("<br>", unsafe_allow_html=True)
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 1, 1])
+
+    with nav_col1:
+        st.button("← Prev", use_container_width=True, disabled=(current_index == 0), key="btn_prev",
+                  on_click=go_to_card, args=(current_index - 1,))
+
+    with nav_col2:
+        if show_answer:
+            st.button("Flip", use_container_width=True, key="btn_flip", on_click=go_to_card, args=(current_index,))
+
+    with nav_col3:
+        st.button("Next →", use_container_width=True, disabled=(current_index == total_cards - 1), key="btn_next",
+                  on_click=go_to_card, args=(current_index + 1,))
+
+
+render_card(is_randomized)
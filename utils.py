@@ -2,9 +2,13 @@
 Utility functions for Streamlit Flashcard App for Complex Topics.
 """
 
+import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+import streamlit as st
+
 
 def format_datetime(dt_string: Optional[str]) -> str:
     """
@@ -46,6 +50,16 @@ def format_date_short(dt_string: Optional[str]) -> str:
         return str(dt_string)
 
 
+# Emoji per complexity level; use COMPLEXITY_EMOJI.get(level, DEFAULT_COMPLEXITY_EMOJI)
+# directly in loops instead of calling get_complexity_emoji
+COMPLEXITY_EMOJI = {
+    "Beginner": "🌱",
+    "Intermediate": "🌿",
+    "Advanced": "🌳"
+}
+DEFAULT_COMPLEXITY_EMOJI = "📚"
+
+
 def get_complexity_emoji(complexity: str) -> str:
     """
     Get an emoji for the complexity level.
@@ -56,12 +70,31 @@ def get_complexity_emoji(complexity: str) -> str:
     Returns:
         Appropriate emoji
     """
-    emojis = {
-        "Beginner": "🌱",
-        "Intermediate": "🌿",
-        "Advanced": "🌳"
-    }
-    return emojis.get(complexity, "📚")
+    return COMPLEXITY_EMOJI.get(complexity, DEFAULT_COMPLEXITY_EMOJI)
+
+
+@lru_cache(maxsize=256)
+def format_deck_label(topic: str, complexity: str) -> str:
+    """
+    Get the short label used for a deck in selectors.
+    
+    Args:
+        topic: The deck topic
+        complexity: Complexity level string
+    
+    Returns:
+        Complexity emoji followed by the topic, cut to 25 characters
+    """
+    return f"{COMPLEXITY_EMOJI.get(complexity, DEFAULT_COMPLEXITY_EMOJI)} {topic[:25]}{'...' if len(topic) > 25 else ''}"
+
+
+# Streamlit color per complexity level
+COMPLEXITY_COLOR = {
+    "Beginner": "green",
+    "Intermediate": "orange",
+    "Advanced": "red"
+}
+DEFAULT_COMPLEXITY_COLOR = "blue"
 
 
 def get_complexity_color(complexity: str) -> str:
@@ -74,12 +107,7 @@ def get_complexity_color(complexity: str) -> str:
     Returns:
         Color string for Streamlit
     """
-    colors = {
-        "Beginner": "green",
-        "Intermediate": "orange", 
-        "Advanced": "red"
-    }
-    return colors.get(complexity, "blue")
+    return COMPLEXITY_COLOR.get(complexity, DEFAULT_COMPLEXITY_COLOR)
 
 
 def truncate_text(text: str, max_length: int = 50) -> str:
@@ -93,9 +121,7 @@ def truncate_text(text: str, max_length: int = 50) -> str:
     Returns:
         Truncated text
     """
-    if len(text) <= max_length:
-        return text
-    return text[:max_length - 3] + "..."
+    return text if len(text) <= max_length else f"{text[:max_length - 3]}..."
 
 
 def validate_topic(topic: str) -> tuple[bool, str]:
@@ -368,6 +394,43 @@ def get_explanation_css() -> str:
     """
 
 
+def minify_css(css: str) -> str:
+    """
+    Strip comments and collapse whitespace in a block of <style> markup.
+    
+    Page scripts re-run on every interaction, so call this through the
+    cached get_page_css rather than directly on each rerun.
+    
+    Args:
+        css: One or more <style> blocks
+    
+    Returns:
+        The same styles on a single line
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+
+
+@lru_cache(maxsize=8)
+def get_page_css(dark_mode: bool, page_css: str) -> str:
+    """
+    Get a page's full stylesheet: the base theme CSS plus its own, minified.
+    
+    Cached per theme and page, so the minify pass only runs the first time
+    a page is shown in each theme.
+    
+    Args:
+        dark_mode: Whether dark mode is enabled
+        page_css: The page's own <style> blocks for that theme
+    
+    Returns:
+        Minified CSS markup ready for st.markdown
+    """
+    return minify_css(get_base_css(dark_mode) + page_css)
+
+
+@lru_cache(maxsize=2)
 def get_base_css(dark_mode: bool = True) -> str:
     """
     Get base CSS for all pages with proper light/dark mode support.
@@ -586,12 +649,47 @@ def get_base_css(dark_mode: bool = True) -> str:
         """
 
 
-def render_header():
-    """Render the app header with logo and title."""
-    import streamlit as st
-    st.markdown("""
+_HEADER_HTML = """
         <div class="app-header">
             <span class="app-header-logo">🧠</span>
             <span class="app-header-title">Smart FlashCards</span>
         </div>
-    """, unsafe_allow_html=True)
+    """
+
+
+def render_header():
+    """Render the app header with logo and title."""
+    # Plain HTML, so skip st.markdown's markdown pass
+    st.html(_HEADER_HTML)
+
+
+def select_cardset(cardset_id: str):
+    """
+    Make a deck the one studied on the Review page.
+    
+    Switching to a different deck starts it from the first card with fresh
+    session stats; selecting the current deck again keeps the position.
+    
+    Args:
+        cardset_id: The ID of the cardset to study
+    """
+    if st.session_state.get("selected_cardset") == cardset_id:
+        return
+    st.session_state.selected_cardset = cardset_id
+    st.session_state.current_card_index = 0
+    st.session_state.view_state = 'question'
+    st.session_state.deck_done = False
+    st.session_state.session_stats = {'again': 0, 'hard': 0, 'good': 0, 'easy': 0}
+
+
+def set_dark_mode(toggle_key: str):
+    """
+    Store a dark mode toggle's new value as the app-wide theme (on_change callback).
+    
+    Running as a callback means the rerun triggered by the toggle already
+    renders with the new theme, so no extra st.rerun() is needed.
+    
+    Args:
+        toggle_key: Session state key of the toggle that changed
+    """
+    st.session_state.dark_mode = st.session_state[toggle_key]